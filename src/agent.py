@@ -1,8 +1,8 @@
 """AI Agent for the Acme Dental Clinic."""
 
-from src.graph import create_booking_graph
+from src.graph import BOOKING_GRAPH
 
 
 def create_acme_dental_agent():
-    """Create and return the compiled booking agent graph."""
-    return create_booking_graph()
+    """Return the compiled booking agent graph (compiled once at import)."""
+    return BOOKING_GRAPH
@@ -0,0 +1,120 @@
+"""In-process response caches: exact (normalised text) and semantic (query embeddings)."""
+
+import time
+from typing import Any
+
+import numpy as np
+
+
+class SemanticCache:
+    """
+    Map query embeddings to previously generated responses.
+
+    A lookup hits when the cosine similarity between the query and a stored embedding reaches
+    ``threshold``, so rephrasings of the same question ("what are your hours?" / "when are you
+    open?") share one answer. Vectors are kept normalised in a preallocated matrix and searched by
+    brute force, which is plenty for a few hundred entries; once ``max_entries`` is reached the
+    least recently used entry is overwritten. ``hits`` and ``misses`` count lookups.
+    """
+
+    def __init__(self, threshold: float = 0.92, max_entries: int = 500):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._vectors: np.ndarray | None = None  # (max_entries, dim), allocated on first add
+        self._values: list[Any] = []
+        self._last_used: list[int] = []
+        self._clock = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    @staticmethod
+    def _normalise(vector: list[float] | np.ndarray) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
+
+    def lookup(self, vector: list[float] | np.ndarray) -> Any | None:
+        """Return the value stored for the most similar embedding, or None below the threshold."""
+        if not self._values:
+            self.misses += 1
+            return None
+
+        similarities = self._vectors[: len(self._values)] @ self._normalise(vector)
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._clock += 1
+        self._last_used[best] = self._clock
+        return self._values[best]
+
+    def add(self, vector: list[float] | np.ndarray, value: Any) -> None:
+        """Store ``value`` under ``vector``, evicting the least recently used entry when full."""
+        normalised = self._normalise(vector)
+        if self._vectors is None:
+            self._vectors = np.empty((self.max_entries, normalised.shape[0]), dtype=np.float32)
+
+        self._clock += 1
+        if len(self._values) < self.max_entries:
+            row = len(self._values)
+            self._values.append(value)
+            self._last_used.append(self._clock)
+        else:
+            row = int(np.argmin(self._last_used))
+            self._values[row] = value
+            self._last_used[row] = self._clock
+
+        self._vectors[row] = normalised
+
+
+class ExactCache:
+    """
+    Map normalised message text to a previously generated response.
+
+    Text is casefolded with whitespace collapsed, so "What are your hours?" and
+    "what are  your hours?" share an entry. Entries expire after ``ttl`` seconds and, once
+    ``max_entries`` is reached, the oldest entry is dropped first. ``hits`` and ``misses`` count
+    lookups.
+    """
+
+    def __init__(self, ttl: float = 3600.0, max_entries: int = 512):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # normalised text -> (monotonic timestamp, value), oldest first
+        self._entries: dict[str, tuple[float, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def normalise(text: str) -> str:
+        return " ".join(text.casefold().split())
+
+    def lookup(self, text: str) -> Any | None:
+        """Value stored for exactly this (normalised) text, or None if missing or expired."""
+        key = self.normalise(text)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if time.monotonic() - entry[0] >= self.ttl:
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def add(self, text: str, value: Any) -> None:
+        """Store ``value`` under ``text``, dropping the oldest entry when full."""
+        key = self.normalise(text)
+        self._entries.pop(key, None)
+        if len(self._entries) >= self.max_entries:
+            del self._entries[next(iter(self._entries))]
+        self._entries[key] = (time.monotonic(), value)
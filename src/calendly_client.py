@@ -1,13 +1,67 @@
 """Calendly API client for scheduling appointments."""
 
 import os
-from datetime import datetime, timedelta
+import time
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from functools import lru_cache
 from typing import Any
 
 import httpx
-from dotenv import load_dotenv
-
-load_dotenv()
+import orjson
+
+
+def _to_utc_string(dt: datetime) -> str:
+    """Format an aware datetime the way Calendly expects it (``YYYY-MM-DDTHH:MM:SSZ``)."""
+    return dt.astimezone(UTC).isoformat(timespec="seconds").replace("+00:00", "Z")
+
+
+# How long (seconds) slow-changing account data is served from the in-process cache.
+CURRENT_USER_TTL = 300.0
+EVENT_TYPES_TTL = 3600.0
+
+# Retry policy for transient failures: rate limiting and gateway/server hiccups.
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.2  # seconds, doubled after every attempt
+MAX_RETRY_AFTER = 10.0  # never honour a Retry-After longer than this
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+def _retry_delay(response: httpx.Response, attempt: int) -> float:
+    """Seconds to wait before retrying ``response``: exponential backoff, or Retry-After on 429."""
+    delay = RETRY_BACKOFF * 2**attempt
+    if response.status_code == 429:
+        try:
+            delay = max(delay, float(response.headers.get("Retry-After", 1)))
+        except ValueError:
+            pass
+    return min(delay, MAX_RETRY_AFTER)
+
+
+@dataclass(slots=True)
+class Invitee:
+    """An appointment invitee; first/last name are split from ``name`` once, at construction."""
+
+    name: str
+    email: str
+    timezone: str = "America/New_York"
+    first_name: str = field(init=False)
+    last_name: str = field(init=False)
+
+    def __post_init__(self) -> None:
+        parts = self.name.strip().split(maxsplit=1)
+        self.first_name = parts[0] if parts else self.name
+        self.last_name = parts[1] if len(parts) > 1 else ""
+
+    def as_calendly_payload(self) -> dict[str, str]:
+        """The ``invitee`` object expected by POST /invitees."""
+        return {
+            "name": self.name,
+            "first_name": self.first_name,
+            "last_name": self.last_name,
+            "email": self.email,
+            "timezone": self.timezone,
+        }
 
 
 class CalendlyClient:
@@ -21,32 +75,112 @@ class CalendlyClient:
         self.base_url = "https://api.calendly.com"
         self.headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
 
+        # One pooled client per instance so consecutive calls reuse keep-alive connections
+        # instead of paying a fresh TCP + TLS handshake on every request. HTTP/2 lets concurrent
+        # requests multiplex over a single connection; httpx advertises gzip/br in
+        # Accept-Encoding and transparently decodes the compressed JSON bodies.
+        # Pool settings live on the transport (a custom transport overrides the client's), which
+        # also retries failed connection attempts - safe for every method since nothing was sent.
+        self._client = httpx.Client(
+            base_url=self.base_url,
+            headers=self.headers,
+            timeout=httpx.Timeout(10.0, connect=5.0),
+            transport=httpx.HTTPTransport(
+                http2=True,
+                retries=MAX_RETRIES,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30.0),
+            ),
+        )
+        # key -> (monotonic timestamp, ETag or None, parsed body)
+        self._cache: dict[str, tuple[float, str | None, Any]] = {}
+
+    def close(self) -> None:
+        """Close the underlying connection pool."""
+        self._client.close()
+
+    def __enter__(self) -> "CalendlyClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """
+        Send a request through the shared client and raise for error statuses.
+
+        429 and transient 5xx responses are retried with backoff for GET requests only; a POST
+        (booking, cancellation) is never replayed once the server may have acted on it.
+        """
+        if "json" in kwargs:
+            # Encode with orjson; the client already sends Content-Type: application/json.
+            kwargs["content"] = orjson.dumps(kwargs.pop("json"))
+
+        attempt = 0
+        while True:
+            response = self._client.request(method, url, **kwargs)
+            if method != "GET" or response.status_code not in RETRYABLE_STATUS_CODES or attempt >= MAX_RETRIES:
+                # 304 only comes back for conditional requests, which the caller handles.
+                if response.status_code != 304:
+                    response.raise_for_status()
+                return response
+
+            time.sleep(_retry_delay(response, attempt))
+            attempt += 1
+
+    def _cached_get(self, key: str, ttl: float, url: str, params: dict[str, Any] | None = None) -> Any:
+        """
+        GET ``url`` and return its JSON body, serving it from the cache for ``ttl`` seconds.
+
+        Once an entry is stale it is revalidated with If-None-Match; a 304 keeps the cached body
+        (no download, no parse) and restarts its TTL.
+        """
+        entry = self._cache.get(key)
+        if entry and time.monotonic() - entry[0] < ttl:
+            return entry[2]
+
+        headers = {"If-None-Match": entry[1]} if entry and entry[1] else None
+        response = self._request("GET", url, params=params, headers=headers)
+        if entry and response.status_code == 304:
+            etag, data = response.headers.get("ETag", entry[1]), entry[2]
+        else:
+            etag, data = response.headers.get("ETag"), orjson.loads(response.content)
+        self._cache[key] = (time.monotonic(), etag, data)
+        return data
+
     def get_current_user(self) -> dict[str, Any]:
-        """Get the current user's information."""
-        with httpx.Client() as client:
-            response = client.get(f"{self.base_url}/users/me", headers=self.headers, timeout=10.0)
-            response.raise_for_status()
-            return response.json()
+        """Get the current user's information (cached for CURRENT_USER_TTL seconds)."""
+        return self._cached_get("me", CURRENT_USER_TTL, "/users/me")
 
-    def get_event_types(self, user_uri: str | None = None, use_env: bool = True) -> list[dict[str, Any]]:
+    def get_event_types(self, user_uri: str | None = None) -> list[dict[str, Any]]:
         """
-        Retrieve event types for the current user.
+        Retrieve event types for the current user (cached for EVENT_TYPES_TTL seconds).
 
         Args:
             user_uri: Optional specific user URI. If None, fetches for current user.
-            use_env: If True, try to use CALENDLY_EVENT_TYPE_URI from env first.
         """
         if not user_uri:
             user_data = self.get_current_user()
             user_uri = user_data.get("resource", {}).get("uri")
 
-        with httpx.Client() as client:
-            response = client.get(
-                f"{self.base_url}/event_types", headers=self.headers, params={"user": user_uri}, timeout=10.0
-            )
-            response.raise_for_status()
-            data = response.json()
-            return data.get("collection", [])
+        data = self._cached_get(f"event_types:{user_uri}", EVENT_TYPES_TTL, "/event_types", params={"user": user_uri})
+        return data.get("collection", [])
+
+    def get_booking_event_type(self) -> dict[str, Any] | None:
+        """
+        The event type appointments are offered and booked against, with its full configuration.
+
+        CALENDLY_EVENT_TYPE_URI selects it when set (a URI-only stub if the current user's event
+        types don't include it); otherwise the account's first event type is used. Availability and
+        booking both resolve it here so slots are never shown for one type and booked against another.
+
+        Returns:
+            The event type object, or None if the account has no event types.
+        """
+        env_event_type_uri = os.getenv("CALENDLY_EVENT_TYPE_URI")
+        event_types = self.get_event_types()
+        if env_event_type_uri:
+            return next((et for et in event_types if et.get("uri") == env_event_type_uri), {"uri": env_event_type_uri})
+        return event_types[0] if event_types else None
 
     def get_available_times(
         self, event_type_uri: str, start_date: str | None = None, end_date: str | None = None
@@ -62,36 +196,33 @@ class CalendlyClient:
         Returns:
             List of available time objects with start_time and invitees_remaining.
         """
+        # Calendly rejects start times in the past, so never ask for anything sooner than 5 minutes out.
+        earliest_dt = datetime.now(UTC) + timedelta(minutes=5)
+
         if not start_date:
-            start_dt = datetime.utcnow()
-            start_date = start_dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+            start_dt = earliest_dt
         elif "T" not in start_date:
-            start_date = f"{start_date}T00:00:00Z"
+            start_dt = datetime.fromisoformat(f"{start_date}T00:00:00+00:00")
+        else:
+            start_dt = datetime.fromisoformat(start_date)
+            if start_dt.tzinfo is None:
+                start_dt = start_dt.replace(tzinfo=UTC)
 
-        start_dt = datetime.fromisoformat(start_date.replace("Z", "+00:00"))
-        now_dt = datetime.utcnow().replace(tzinfo=start_dt.tzinfo)
-
-        if start_dt < now_dt + timedelta(minutes=5):
-            start_dt = now_dt + timedelta(minutes=5)
-            start_date = start_dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+        start_dt = max(start_dt, earliest_dt)
+        start_date = _to_utc_string(start_dt)
 
         if not end_date:
-            end_dt = start_dt + timedelta(days=7)
-            end_date = end_dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+            end_date = _to_utc_string(start_dt + timedelta(days=7))
         elif "T" not in end_date:
             end_date = f"{end_date}T23:59:59Z"
 
-        with httpx.Client() as client:
-            response = client.get(
-                f"{self.base_url}/event_type_available_times",
-                headers=self.headers,
-                params={"event_type": event_type_uri, "start_time": start_date, "end_time": end_date},
-                timeout=10.0,
-            )
-
-            response.raise_for_status()
-            data = response.json()
-            return data.get("collection", [])
+        response = self._request(
+            "GET",
+            "/event_type_available_times",
+            params={"event_type": event_type_uri, "start_time": start_date, "end_time": end_date},
+        )
+        data = orjson.loads(response.content)
+        return data.get("collection", [])
 
     def create_invitee(
         self,
@@ -118,20 +249,10 @@ class CalendlyClient:
         Returns:
             Created invitee object with cancel_url, reschedule_url, etc.
         """
-        name_parts = name.strip().split(maxsplit=1)
-        first_name = name_parts[0] if name_parts else name
-        last_name = name_parts[1] if len(name_parts) > 1 else ""
-
         payload: dict[str, Any] = {
             "event_type": event_type_uri,
             "start_time": start_time,
-            "invitee": {
-                "name": name,
-                "first_name": first_name,
-                "last_name": last_name,
-                "email": email,
-                "timezone": timezone,
-            },
+            "invitee": Invitee(name, email, timezone).as_calendly_payload(),
         }
 
         if location_kind:
@@ -140,57 +261,46 @@ class CalendlyClient:
                 location_obj["location"] = location_location
             payload["location"] = location_obj
 
-        with httpx.Client() as client:
-            response = client.post(f"{self.base_url}/invitees", headers=self.headers, json=payload, timeout=15.0)
-
-            response.raise_for_status()
-            data = response.json()
-            return data.get("resource", {})
+        response = self._request("POST", "/invitees", json=payload, timeout=15.0)
+        data = orjson.loads(response.content)
+        return data.get("resource", {})
 
     def list_scheduled_events(self, invitee_email: str) -> list[dict[str, Any]]:
         """
-        List scheduled events for a specific invitee email.
+        List upcoming scheduled events for a specific invitee email.
+
+        Filtering happens server-side (``invitee_email``, active status, ``min_start_time`` of
+        now), so this is a single request regardless of how many events the organization has, and
+        past appointments never count against the page size.
 
         Args:
             invitee_email: Email address of the invitee
 
         Returns:
-            List of scheduled event objects with invitee details
+            List of scheduled event objects
         """
-        user_data = self.get_current_user()
-        org_uri = user_data.get("resource", {}).get("current_organization")
+        # CALENDLY_ORG_URI skips the /users/me round-trip that only serves to find the organization.
+        org_uri = os.getenv("CALENDLY_ORG_URI")
+        if not org_uri:
+            user_data = self.get_current_user()
+            org_uri = user_data.get("resource", {}).get("current_organization")
 
         if not org_uri:
             return []
 
-        with httpx.Client() as client:
-            response = client.get(
-                f"{self.base_url}/scheduled_events",
-                headers=self.headers,
-                params={"organization": org_uri, "status": "active", "count": 100},
-                timeout=10.0,
-            )
-            response.raise_for_status()
-            data = response.json()
-            events = data.get("collection", [])
-
-        matching_events = []
-        for event in events:
-            event_uri = event.get("uri")
-
-            with httpx.Client() as client:
-                inv_response = client.get(f"{event_uri}/invitees", headers=self.headers, timeout=10.0)
-                inv_response.raise_for_status()
-                inv_data = inv_response.json()
-                invitees = inv_data.get("collection", [])
-
-            for invitee in invitees:
-                if invitee.get("email", "").lower() == invitee_email.lower():
-                    event["invitee"] = invitee
-                    matching_events.append(event)
-                    break
-
-        return matching_events
+        response = self._request(
+            "GET",
+            "/scheduled_events",
+            params={
+                "organization": org_uri,
+                "status": "active",
+                "invitee_email": invitee_email,
+                "min_start_time": _to_utc_string(datetime.now(UTC)),
+                "count": 100,
+            },
+        )
+        data = orjson.loads(response.content)
+        return data.get("collection", [])
 
     def cancel_event(self, event_uri: str, reason: str = "Canceled by user request") -> dict[str, Any]:
         """
@@ -203,10 +313,17 @@ class CalendlyClient:
         Returns:
             Cancellation response data
         """
-        with httpx.Client() as client:
-            response = client.post(
-                f"{event_uri}/cancellation", headers=self.headers, json={"reason": reason}, timeout=10.0
-            )
-            response.raise_for_status()
-            data = response.json()
-            return data.get("resource", {})
+        response = self._request("POST", f"{event_uri}/cancellation", json={"reason": reason})
+        data = orjson.loads(response.content)
+        return data.get("resource", {})
+
+
+@lru_cache(maxsize=1)
+def get_client() -> CalendlyClient:
+    """
+    Process-wide client shared by the graph nodes and tools.
+
+    Reusing one instance keeps its connection pool warm and lets the current-user / event-type
+    cache outlive a single call. The API token is read on first use.
+    """
+    return CalendlyClient()
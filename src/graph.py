@@ -1,5 +1,9 @@
 """LangGraph state machine for the Acme Dental booking agent."""
 
+from collections.abc import Callable
+from functools import lru_cache
+
+from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import END, StateGraph
 
 # Nodes
@@ -34,62 +38,77 @@ from src.routing import (
 )
 from src.state import AgentState
 
-
-def create_booking_graph():
-    """Create and compile the booking agent graph."""
-    workflow = StateGraph(AgentState)
-
-    # Add nodes
-    workflow.add_node("check_existing_flow", check_existing_flow)
-    workflow.add_node("router", router)
-    workflow.add_node("booking_collect_identity", booking_collect_identity)
-    workflow.add_node("ask_for_name_email", ask_for_name_email)
-    workflow.add_node("ask_for_time_preference", ask_for_time_preference)
-    workflow.add_node("parse_time_preference", parse_time_preference)
-    workflow.add_node("booking_check_availability", booking_check_availability)
-    workflow.add_node("parse_slot_selection", parse_slot_selection)
-
-    workflow.add_node("booking_create", booking_create)
-    workflow.add_node("confirm_booking", confirm_booking)
-
+# (name, callable) for every node in the graph.
+NODES: tuple[tuple[str, Callable], ...] = (
+    ("check_existing_flow", check_existing_flow),
+    ("router", router),
+    ("booking_collect_identity", booking_collect_identity),
+    ("ask_for_name_email", ask_for_name_email),
+    ("ask_for_time_preference", ask_for_time_preference),
+    ("parse_time_preference", parse_time_preference),
+    ("booking_check_availability", booking_check_availability),
+    ("parse_slot_selection", parse_slot_selection),
+    ("booking_create", booking_create),
+    ("confirm_booking", confirm_booking),
     # Generic nodes (Book/Cancel/Reschedule)
-    workflow.add_node("lookup_events", lookup_events)
-    workflow.add_node("select_event", select_event)
-    workflow.add_node("confirm_action", confirm_action)
-
-    workflow.add_node("handle_faq", handle_faq)
-    workflow.add_node("respond_to_user", respond_to_user)
-    workflow.add_node("tool_error_handler", tool_error_handler)
+    ("lookup_events", lookup_events),
+    ("select_event", select_event),
+    ("confirm_action", confirm_action),
+    ("handle_faq", handle_faq),
+    ("respond_to_user", respond_to_user),
+    ("tool_error_handler", tool_error_handler),
+)
 
-    # Set entry point to check state first
-    workflow.set_entry_point("check_existing_flow")
+# (source, routing function) for every conditional edge.
+CONDITIONAL_EDGES: tuple[tuple[str, Callable], ...] = (
+    ("check_existing_flow", route_from_entry),
+    ("router", route_after_router),
+    ("booking_collect_identity", route_after_identity_check),
+    ("booking_check_availability", route_after_availability_check),
+    ("parse_slot_selection", route_after_slot_selection),
+    # Generic flow edges
+    ("lookup_events", route_after_lookup),
+    ("select_event", route_after_selection),
+)
 
-    # Add edges
-    workflow.add_conditional_edges("check_existing_flow", route_from_entry)
+# (source, target) for every static edge.
+EDGES: tuple[tuple[str, str], ...] = (
+    ("ask_for_name_email", END),
+    ("ask_for_time_preference", END),
+    ("parse_time_preference", "booking_check_availability"),
+    ("booking_create", "confirm_booking"),
+    ("confirm_booking", END),
+    ("confirm_action", END),
+    ("handle_faq", END),
+    ("respond_to_user", END),
+    ("tool_error_handler", END),
+)
 
-    workflow.add_conditional_edges("router", route_after_router)
 
-    workflow.add_conditional_edges("booking_collect_identity", route_after_identity_check)
+@lru_cache(maxsize=1)
+def create_booking_graph():
+    """
+    Create and compile the booking agent graph (built once, then reused).
 
-    workflow.add_edge("ask_for_name_email", END)
+    State between turns is persisted by an in-memory checkpointer, so callers pass a
+    ``{"configurable": {"thread_id": ...}}`` config and only the new messages for each turn.
+    """
+    workflow = StateGraph(AgentState)
 
-    workflow.add_edge("ask_for_time_preference", END)
-    workflow.add_edge("parse_time_preference", "booking_check_availability")
+    for name, node in NODES:
+        workflow.add_node(name, node)
 
-    workflow.add_conditional_edges("booking_check_availability", route_after_availability_check)
+    # Set entry point to check state first
+    workflow.set_entry_point("check_existing_flow")
 
-    workflow.add_conditional_edges("parse_slot_selection", route_after_slot_selection)
+    for source, route in CONDITIONAL_EDGES:
+        workflow.add_conditional_edges(source, route)
 
-    workflow.add_edge("booking_create", "confirm_booking")
-    workflow.add_edge("confirm_booking", END)
+    for source, target in EDGES:
+        workflow.add_edge(source, target)
 
-    # Generic flow edges
-    workflow.add_conditional_edges("lookup_events", route_after_lookup)
-    workflow.add_conditional_edges("select_event", route_after_selection)
-    workflow.add_edge("confirm_action", END)
+    return workflow.compile(checkpointer=MemorySaver())
 
-    workflow.add_edge("handle_faq", END)
-    workflow.add_edge("respond_to_user", END)
-    workflow.add_edge("tool_error_handler", END)
 
-    return workflow.compile()
+# Compiled once at import; every caller shares this instance.
+BOOKING_GRAPH = create_booking_graph()
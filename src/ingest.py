@@ -1,11 +1,54 @@
+import json
 import os
 import time
+import uuid
 
+import numpy as np
 from dotenv import load_dotenv
-from langchain_openai import OpenAIEmbeddings
-from langchain_pinecone import PineconeVectorStore
 from langchain_text_splitters import MarkdownHeaderTextSplitter
-from pinecone import Pinecone, ServerlessSpec
+from pinecone import ServerlessSpec
+
+from src.tools.kb_rag import KB_EMBEDDINGS_PATH, KB_TEXTS_PATH
+from src.vectorstore import INDEX_NAME, get_embeddings, get_pinecone
+
+# Seconds to wait for a newly created index to become ready.
+INDEX_READY_TIMEOUT = 300.0
+# Vectors per Pinecone upsert request.
+UPSERT_BATCH_SIZE = 100
+
+
+def embed_chunks(texts: list[str]) -> np.ndarray:
+    """
+    Embed every chunk once; the vectors feed both the local export and the Pinecone upsert.
+
+    Vectors are L2-normalised so a single matrix-vector product gives cosine similarities.
+    """
+    vectors = np.asarray(get_embeddings().embed_documents(texts), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def export_local_index(texts: list[str], vectors: np.ndarray) -> None:
+    """Write the chunks' embeddings and texts for in-process search (see ``src.tools.kb_rag``)."""
+    np.save(KB_EMBEDDINGS_PATH, vectors)
+    with open(KB_TEXTS_PATH, "w") as f:
+        json.dump(texts, f)
+
+
+def upsert_chunks(documents, vectors: np.ndarray) -> None:
+    """
+    Upsert the already embedded chunks to the Pinecone index in batches of UPSERT_BATCH_SIZE.
+
+    Each record carries the chunk's header metadata plus its text under ``text``, the layout
+    PineconeVectorStore reads back at query time.
+    """
+    index = get_pinecone().Index(INDEX_NAME)
+    records = [
+        (str(uuid.uuid4()), vector.tolist(), {**doc.metadata, "text": doc.page_content})
+        for doc, vector in zip(documents, vectors, strict=True)
+    ]
+    for start in range(0, len(records), UPSERT_BATCH_SIZE):
+        index.upsert(vectors=records[start : start + UPSERT_BATCH_SIZE])
 
 
 def ingest_knowledge_base():
@@ -30,14 +73,29 @@ def ingest_knowledge_base():
 
     print(f"Split into {len(md_header_splits)} chunks")
 
+    texts = [doc.page_content for doc in md_header_splits]
+
+    print("Embedding chunks...")
+    try:
+        vectors = embed_chunks(texts)
+    except Exception as e:
+        print(f"Error embedding chunks: {e}")
+        return
+
+    print("Exporting local index...")
+    try:
+        export_local_index(texts, vectors)
+    except Exception as e:
+        print(f"Error exporting local index: {e}")
+
     pinecone_api_key = os.getenv("PINECONE_API_KEY")
     if not pinecone_api_key:
         print("PINECONE_API_KEY not found in environment variables")
         return
 
-    index_name = "acme-dental-index"
+    index_name = INDEX_NAME
 
-    pc = Pinecone(api_key=pinecone_api_key)
+    pc = get_pinecone()
 
     # Check if index exists, create if not
     existing_indexes = [index_info["name"] for index_info in pc.list_indexes()]
@@ -48,21 +106,21 @@ def ingest_knowledge_base():
             pc.create_index(
                 name=index_name, dimension=1536, metric="cosine", spec=ServerlessSpec(cloud="aws", region="us-east-1")
             )
+            # Back off between readiness checks (0.25s doubling to 8s) and give up after 5 minutes
+            delay, waited = 0.25, 0.0
             while not pc.describe_index(index_name).status["ready"]:
-                time.sleep(1)
+                if waited >= INDEX_READY_TIMEOUT:
+                    raise TimeoutError(f"Index {index_name} not ready after {INDEX_READY_TIMEOUT:.0f}s")
+                time.sleep(delay)
+                waited += delay
+                delay = min(delay * 2, 8.0)
         except Exception as e:
             print(f"Error creating index: {e}")
             return
 
     print("Upserting to Pinecone...")
     try:
-        embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
-
-        PineconeVectorStore.from_documents(
-            documents=md_header_splits,
-            embedding=embeddings,
-            index_name=index_name,
-        )
+        upsert_chunks(md_header_splits, vectors)
         print("Ingestion complete.")
     except Exception as e:
         print(f"Error during upsert: {e}")
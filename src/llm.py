@@ -1,14 +1,30 @@
 import os
+from functools import lru_cache
 
-from langchain_anthropic import ChatAnthropic
+import httpx
+from langchain_core.caches import BaseCache, InMemoryCache
 from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import SystemMessage
 from langchain_openai import ChatOpenAI
+from openai import DefaultAsyncHttpxClient, DefaultHttpxClient
 
+# Keep idle connections to the API open between turns (a user takes longer than httpx's default
+# 5s expiry to reply) so a turn doesn't start with a fresh TCP/TLS handshake.
+OPENAI_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0)
 
-def get_llm(temperature: float = 0) -> BaseChatModel:
+
+def get_llm(temperature: float = 0, max_tokens: int | None = None, latency_optimized: bool = False) -> BaseChatModel:
     """
     Get the LLM instance based on environment configuration.
 
+    The environment is read on every call, but the client itself is built once per configuration
+    (see ``_build_llm``), so every node and every turn reuses the same instance and its HTTP
+    connection pool. ``max_tokens`` caps the reply length; None keeps the provider default.
+    ``latency_optimized`` marks short, user-facing calls: on OpenAI they are sent with the
+    LLM_LATENCY_SERVICE_TIER service tier (e.g. "priority") when one is configured.
+    Deterministic (temperature 0) clients answer repeated prompts from a response cache, kept in
+    memory or, with LLM_CACHE_PATH set, in a SQLite file that survives restarts.
+
     Supported Providers:
     - openai (default)
     - anthropic
@@ -17,8 +33,11 @@ def get_llm(temperature: float = 0) -> BaseChatModel:
     - LLM_PROVIDER: "openai" or "anthropic"
     - OPENAI_API_KEY: Required for OpenAI
     - ANTHROPIC_API_KEY: Required for Anthropic
+    - LLM_LATENCY_SERVICE_TIER: Optional OpenAI service tier for latency-optimized calls
+    - LLM_CACHE_PATH: Optional SQLite file for the temperature 0 response cache
     """
     provider = os.getenv("LLM_PROVIDER", "openai").lower()
+    cache_path = os.getenv("LLM_CACHE_PATH")
 
     if provider == "anthropic":
         api_key = os.getenv("ANTHROPIC_API_KEY")
@@ -27,7 +46,8 @@ def get_llm(temperature: float = 0) -> BaseChatModel:
 
         # Anthropic models: claude-3-opus-20240229, claude-3-sonnet-20240229, claude-3-haiku-20240307
         model = os.getenv("LLM_MODEL", "claude-3-haiku-20240307")
-        return ChatAnthropic(model=model, temperature=temperature, anthropic_api_key=api_key)
+        # The Anthropic API has no per-request latency mode (that is a Bedrock feature)
+        return _build_llm("anthropic", model, temperature, max_tokens, api_key, cache_path=cache_path)
 
     else:
         # Default to OpenAI
@@ -43,8 +63,86 @@ def get_llm(temperature: float = 0) -> BaseChatModel:
             pass
 
         model = os.getenv("LLM_MODEL", "gpt-4o-mini")
-        return ChatOpenAI(
-            model=model,
-            temperature=temperature,
-            api_key=api_key,  # type: ignore
-        )
+        # Priority processing is billed at a premium, so it stays opt-in per deployment
+        service_tier = os.getenv("LLM_LATENCY_SERVICE_TIER") if latency_optimized else None
+        return _build_llm("openai", model, temperature, max_tokens, api_key, service_tier, cache_path)
+
+
+def system_message(prompt: str) -> SystemMessage:
+    """
+    System message for a static prompt, marked as a prompt-cache breakpoint on Anthropic.
+
+    Anthropic only reuses a cached prefix up to an explicit ``cache_control`` marker; OpenAI caches
+    stable prefixes automatically and gets the plain string.
+    """
+    if os.getenv("LLM_PROVIDER", "openai").lower() == "anthropic":
+        return SystemMessage(content=[{"type": "text", "text": prompt, "cache_control": {"type": "ephemeral"}}])
+    return SystemMessage(content=prompt)
+
+
+@lru_cache(maxsize=4)
+def _response_cache(path: str | None) -> BaseCache:
+    """Shared LLM response cache: in memory, or in the SQLite file at ``path``."""
+    if path is None:
+        return InMemoryCache()
+
+    from langchain_community.cache import SQLiteCache
+
+    return SQLiteCache(database_path=path)
+
+
+@lru_cache(maxsize=1)
+def _openai_http_clients() -> tuple[httpx.Client, httpx.AsyncClient]:
+    """
+    HTTP/2 clients shared by every OpenAI chat model, so all calls multiplex over one pool.
+
+    The SDK's default client classes keep its timeouts and redirect handling.
+    """
+    return (
+        DefaultHttpxClient(http2=True, limits=OPENAI_HTTP_LIMITS),
+        DefaultAsyncHttpxClient(http2=True, limits=OPENAI_HTTP_LIMITS),
+    )
+
+
+@lru_cache(maxsize=16)
+def _build_llm(
+    provider: str,
+    model: str,
+    temperature: float,
+    max_tokens: int | None,
+    api_key: str | None,
+    service_tier: str | None = None,
+    cache_path: str | None = None,
+) -> BaseChatModel:
+    """
+    Construct a chat model client; memoised on the full configuration.
+
+    Keying on provider, model and key as well as the call parameters means a changed environment
+    (e.g. .env loaded after a first call, or a different LLM_MODEL) gets a new client instead of a
+    stale cached one.
+
+    Only temperature 0 clients get a response cache: sampled replies are meant to vary, and the
+    cache is keyed on the prompt and model parameters, so it never crosses configurations.
+    """
+    cache = _response_cache(cache_path) if temperature == 0 else None
+
+    if provider == "anthropic":
+        # Imported here: the Anthropic SDK takes most of a second to import and is dead weight for
+        # the default OpenAI provider
+        from langchain_anthropic import ChatAnthropic
+
+        # ChatAnthropic always sends a max_tokens; only override its default when a cap was asked for
+        limits = {"max_tokens": max_tokens} if max_tokens is not None else {}
+        return ChatAnthropic(model=model, temperature=temperature, anthropic_api_key=api_key, cache=cache, **limits)
+
+    http_client, http_async_client = _openai_http_clients()
+    return ChatOpenAI(
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        service_tier=service_tier,
+        api_key=api_key,  # type: ignore
+        cache=cache,
+        http_client=http_client,
+        http_async_client=http_async_client,
+    )
@@ -1,13 +1,100 @@
 """Main entry point for the Acme Dental AI Agent."""
 
+import asyncio
+import logging
+import os
+from uuid import uuid4
+
 from dotenv import load_dotenv
-from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, RemoveMessage, trim_messages
 
 from src.agent import create_acme_dental_agent
 
-
-def main():
+# Messages carried into each turn. Nodes only read the latest user message (identity extraction
+# the last two), and flow progress lives in dedicated state keys, so older turns are dead weight.
+MAX_HISTORY_MESSAGES = 20
+
+# Nodes whose replies are generated by the LLM and printed token by token as they arrive.
+STREAMED_NODES = frozenset({"respond_to_user", "handle_faq"})
+
+# State for a new conversation; afterwards the graph's checkpointer carries it between turns.
+INITIAL_STATE = {
+    "intent": None,
+    "flow": "IDLE",
+    "user_name": None,
+    "user_email": None,
+    "time_preference": None,
+    "asked_for_preference": False,
+    "selected_slot": None,
+    "available_slots": None,
+    "error": None,
+    "lookup_email": None,
+    "matched_events": None,
+    "selected_event_uri": None,
+    "confirmed": False,
+}
+
+
+async def run_turn(agent, turn_input: dict, config: dict) -> None:
+    """
+    Run one turn, printing the agent's replies as they are produced.
+
+    LLM replies are streamed token by token; every other reply is printed from the delta of the
+    node that added it, so the (checkpointed, ever growing) message history is never rescanned.
+    """
+    streamed_ids: set[str] = set()
+
+    async for mode, chunk in agent.astream(turn_input, config, stream_mode=["messages", "updates"]):
+        if mode == "updates":
+            for update in chunk.values():
+                if not isinstance(update, dict):
+                    continue
+                for msg in update.get("messages", []):
+                    if not isinstance(msg, AIMessage):
+                        continue
+                    if msg.id in streamed_ids:
+                        print("\n")
+                    else:
+                        print(f"\nAgent: {msg.content}\n")
+            continue
+
+        message, metadata = chunk
+        if not isinstance(message, AIMessageChunk) or metadata.get("langgraph_node") not in STREAMED_NODES:
+            continue
+        if message.id not in streamed_ids:
+            streamed_ids.add(message.id)
+            print("\nAgent: ", end="", flush=True)
+        print(message.content, end="", flush=True)
+
+
+async def build_turn_input(agent, config: dict, user_message: HumanMessage) -> dict:
+    """
+    The update that starts a turn: the user's message, plus removals that keep the history window.
+
+    The checkpointed conversation is read fresh each turn, so a turn that failed halfway can't
+    leave the window computed from stale messages.
+    """
+    snapshot = await agent.aget_state(config)
+    if not snapshot.values:
+        return {**INITIAL_STATE, "messages": [user_message]}
+
+    history = snapshot.values.get("messages", [])
+    window = trim_messages(
+        [*history, user_message],
+        max_tokens=MAX_HISTORY_MESSAGES,
+        token_counter=len,
+        strategy="last",
+        start_on="human",
+    )
+    kept_ids = {message.id for message in window}
+    removals = [RemoveMessage(id=message.id) for message in history if message.id not in kept_ids]
+    return {"messages": [*removals, user_message]}
+
+
+async def main():
     load_dotenv()
+    # Node diagnostics are logged at DEBUG; LOG_LEVEL=DEBUG shows them without touching the code
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "WARNING").upper())
     agent = create_acme_dental_agent()
 
     print("🦷 Acme Dental AI Agent")
@@ -15,25 +102,8 @@ def main():
     print("Welcome! I can help you book appointments or answer questions about our clinic.")
     print("Type 'exit', 'quit', or 'q' to end the session.\n")
 
-    # Initialize persistent state for the conversation
-    state = {
-        "messages": [],
-        "intent": None,
-        "flow": "IDLE",
-        "user_name": None,
-        "user_email": None,
-        "time_preference": None,
-        "asked_for_preference": False,
-        "selected_slot": None,
-        "available_slots": None,
-        "error": None,
-        "lookup_email": None,
-        "matched_events": None,
-        "selected_event_uri": None,
-        "confirmed": False,
-    }
-
-    last_printed_count = 0  # Track how many messages we've printed
+    # One conversation per session; the checkpointer persists its state under this thread
+    config = {"configurable": {"thread_id": str(uuid4())}}
 
     while True:
         user_input = input("You: ")
@@ -42,57 +112,15 @@ def main():
             break
 
         try:
-            # Append new user message to existing conversation
-            state["messages"].append(HumanMessage(content=user_input))
-
-            # Invoke the graph with the current state
-            result = agent.invoke(state)
-
-            # Update state with results, preserving collected information
-            state["messages"] = result.get("messages", state["messages"])
-            state["intent"] = result.get("intent", state["intent"])
-
-            # Preserve user info and booking data once collected
-            if result.get("user_name"):
-                state["user_name"] = result["user_name"]
-            if result.get("user_email"):
-                state["user_email"] = result["user_email"]
-            if result.get("time_preference"):
-                state["time_preference"] = result["time_preference"]
-            if result.get("asked_for_preference") is not None:
-                state["asked_for_preference"] = result["asked_for_preference"]
-            if result.get("selected_slot"):
-                state["selected_slot"] = result["selected_slot"]
-            if result.get("available_slots"):
-                state["available_slots"] = result["available_slots"]
-
-            # Persist unified flow state
-            state["flow"] = result.get("flow", "IDLE")
-
-            if result.get("lookup_email"):
-                state["lookup_email"] = result["lookup_email"]
-            if result.get("matched_events"):
-                state["matched_events"] = result["matched_events"]
-            if result.get("selected_event_uri"):
-                state["selected_event_uri"] = result["selected_event_uri"]
-            if result.get("confirmed") is not None:
-                state["confirmed"] = result["confirmed"]
-
-            state["error"] = result.get("error")
-
-            # Print only NEW AI messages (delta)
-            messages = state["messages"]
-            new_messages = messages[last_printed_count:]
-
-            for msg in new_messages:
-                if isinstance(msg, AIMessage):
-                    print(f"\nAgent: {msg.content}\n")
-
-            last_printed_count = len(messages)
+            user_message = HumanMessage(content=user_input)
+            turn_input = await build_turn_input(agent, config, user_message)
+
+            # Run the graph on the new message, printing only the replies this turn adds
+            await run_turn(agent, turn_input, config)
 
         except Exception as e:
             print(f"\n❌ Error: {e}\n")
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
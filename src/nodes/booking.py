@@ -1,80 +1,198 @@
-import json
+import heapq
+import logging
 import re
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
 from datetime import datetime
-
-from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
-
-from src.calendly_client import CalendlyClient
-from src.llm import get_llm
+from functools import lru_cache
+from itertools import product
+from operator import itemgetter
+
+from langchain_core.exceptions import OutputParserException
+from langchain_core.messages import AIMessage, HumanMessage
+from pydantic import BaseModel, Field
+
+from src.calendly_client import get_client
+from src.llm import get_llm, system_message
+from src.nodes.utils import find_email, fold_text, last_user_content
+from src.prompts import IDENTITY_EXTRACT_SYSTEM_PROMPT
 from src.state import AgentState
+from src.timeutils import format_appointment_time
 from src.tools import create_booking
 
+logger = logging.getLogger(__name__)
+
+# Only ever applied to lowercased input.
+TIME_RE = re.compile(r"(\d{1,2})(?::(\d{2}))?\s*(am|pm)?")
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+# Full names and the usual abbreviations ("tue", "tues", "thu", "thurs", ...), optionally plural.
+DAY_RE = re.compile(
+    r"\b(mon(?:day)?|tue(?:s(?:day)?)?|wed(?:nesday)?|thu(?:r(?:s(?:day)?)?)?|fri(?:day)?|sat(?:urday)?|sun(?:day)?)s?\b"
+)
+# Part-of-day words, matched as substrings anywhere ("am" / "pm" count too). The lookahead lets
+# overlapping words both register ("pmorning"); across the message, morning > afternoon > evening.
+PART_OF_DAY_PRIORITY = ("morning", "afternoon", "evening")
+PART_OF_DAY_RE = re.compile(r"(?=(?P<morning>morning|am)|(?P<afternoon>afternoon|pm)|(?P<evening>evening))")
+# Three-letter prefix -> weekday bit, so any mix of mentions folds into one 7-bit mask.
+_DAY_BITS = {day[:3]: 1 << i for i, day in enumerate(WEEKDAYS)}
+# Hour-of-day lookups: display label and part of day (morning 6-11, afternoon 12-16, evening 17-20).
+HOUR_LABELS = tuple(f"{h % 12 or 12} {'AM' if h < 12 else 'PM'}" for h in range(24))
+HOUR_BUCKETS = tuple(
+    "morning" if 6 <= h < 12 else "afternoon" if 12 <= h < 17 else "evening" if 17 <= h < 21 else None
+    for h in range(24)
+)
+# Part of day offered instead when the exact requested hour is taken.
+FALLBACK_BUCKETS = tuple("morning" if h < 12 else "afternoon" if h < 17 else None for h in range(24))
+# A bare "First Last" (2-4 capitalised words) in front of the email; anything else goes to the LLM.
+NAME_RE = re.compile(r"[A-Z][A-Za-z'-]+(?:\s+[A-Z][A-Za-z'-]+){1,3}")
+
+
+class ExtractedIdentity(BaseModel):
+    """Identity details the user has explicitly stated."""
+
+    name: str | None = Field(default=None, description="The user's full name, if stated")
+    email: str | None = Field(default=None, description="The user's email address, if stated")
+
+
+@lru_cache(maxsize=1)
+def _identity_extractor():
+    """Chat model bound to the ExtractedIdentity schema (the SDK returns the parsed object)."""
+    return get_llm(temperature=0).with_structured_output(ExtractedIdentity)
 
-def booking_collect_identity(state: AgentState) -> AgentState:
+
+def _event_type_uri() -> str:
+    """
+    URI of the event type availability is shown for.
+
+    Resolved on every call through the same client method create_booking uses, so the two can't
+    drift apart; the client's TTL/ETag cache keeps repeat resolutions off the network.
+    """
+    event_type = get_client().get_booking_event_type()
+    if event_type is None:
+        raise ValueError("No Calendly event types found.")
+    return event_type["uri"]
+
+
+# Slots listed per availability reply.
+MAX_SLOTS_SHOWN = 10
+
+
+@dataclass(frozen=True, slots=True)
+class SlotIndex:
+    """One fetch of available slots, parsed once and indexed for preference filtering."""
+
+    # Every slot in fetch order, with its parsed start (None when unparseable; shown verbatim)
+    entries: list[tuple[datetime | None, dict]]
+    # The slots with a parsed start, in fetch order
+    timed: list[tuple[datetime, dict]]
+    # Weekday name -> that day's timed slots, in fetch order
+    by_day: dict[str, list[tuple[datetime, dict]]]
+
+
+def _index_slots(slots: list[dict]) -> SlotIndex:
+    """Parse every slot's start time once; the datetime serves both filtering and display."""
+    entries: list[tuple[datetime | None, dict]] = []
+    timed: list[tuple[datetime, dict]] = []
+    by_day: dict[str, list[tuple[datetime, dict]]] = defaultdict(list)
+    for slot in slots:
+        start_time = slot.get("start_time")
+        try:
+            dt = datetime.fromisoformat(start_time) if isinstance(start_time, str) else None
+        except ValueError:
+            dt = None
+        if dt is None:
+            entries.append((None, slot))
+            continue
+        entries.append((dt, slot))
+        timed.append((dt, slot))
+        by_day[WEEKDAYS[dt.weekday()]].append((dt, slot))
+    return SlotIndex(entries, timed, dict(by_day))
+
+
+# How long (seconds) fetched availability is reused across turns; cleared after a booking.
+SLOTS_TTL = 30.0
+# event type URI -> (monotonic timestamp, indexed slots)
+_slots_cache: dict[str, tuple[float, SlotIndex]] = {}
+# Sync nodes run on worker threads under ainvoke; holding the lock across the fetch collapses a
+# burst of concurrent availability checks into a single Calendly call.
+_slots_lock = threading.Lock()
+
+
+def _available_times(event_type_uri: str) -> SlotIndex:
+    """
+    Available slots for ``event_type_uri``, reusing a fetch from the last SLOTS_TTL seconds.
+
+    The cached fetch is kept already indexed, so follow-up turns that re-filter it with a new
+    preference don't parse it again.
+    """
+    with _slots_lock:
+        entry = _slots_cache.get(event_type_uri)
+        if entry and time.monotonic() - entry[0] < SLOTS_TTL:
+            return entry[1]
+
+        index = _index_slots(get_client().get_available_times(event_type_uri))
+        _slots_cache[event_type_uri] = (time.monotonic(), index)
+        return index
+
+
+async def booking_collect_identity(state: AgentState) -> AgentState:
     """
     Extract user's name and email from conversation history.
 
     Strategy:
     1. Check state for existing identity.
-    2. Try regex extraction for "name email" patterns.
+    2. Try regex extraction for "First Last email" patterns; return if both are found, or if the
+       name is already known and only the email was missing.
     3. Use LLM extraction if regex fails or is ambiguous.
     """
 
     # If we already have both, skip extraction
     if state.get("user_name") and state.get("user_email"):
-        return state
+        return {}
 
     # Get the last user message for regex extraction
-    last_user_msg = next((m for m in reversed(state["messages"]) if isinstance(m, HumanMessage)), None)
-    if not last_user_msg:
-        return state
+    user_content = last_user_content(state)
+    if user_content is None:
+        return {}
 
     # Try simple regex first (faster and more reliable for "name email" format)
 
-    text = last_user_msg.content
-    email_pattern = r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b"
-    emails = re.findall(email_pattern, text)
-
+    text = user_content
+    regex_email = find_email(text)
     regex_name = None
-    regex_email = None
 
-    if emails:
-        regex_email = emails[0]
+    if regex_email:
         # Name is everything before the email
-        name_part = text.split(regex_email)[0].strip()
-        if name_part and len(name_part) > 2:
+        name_part = text.split(regex_email)[0].strip().rstrip(",;:-").strip()
+        if NAME_RE.fullmatch(name_part):
             regex_name = name_part
 
-    llm = get_llm(temperature=0)
-
-    system_prompt = """Extract ONLY the user's full name and email address from the conversation.
-
-Respond in this exact JSON format:
-{"name": "John Doe", "email": "john@example.com"}
-
-If either is missing:
-{"name": null, "email": null}
+    # Regex found both: no need for an LLM round-trip
+    if regex_name and regex_email:
+        return {"user_name": regex_name, "user_email": regex_email}
 
-IMPORTANT:
-- Only extract if explicitly stated
-- Do NOT ask follow-up questions
-- Do NOT make assumptions
-- Return ONLY the JSON, nothing else"""
-
-    response = llm.invoke([SystemMessage(content=system_prompt), *state["messages"]])
+    # Name was given on an earlier turn and this reply only had to supply the email
+    if regex_email and state.get("user_name"):
+        return {"user_email": regex_email}
 
     try:
-        # Clean response in case LLM added extra text
-        content = response.content.strip()
-        # Find JSON object in response
-        if "{" in content:
-            json_start = content.index("{")
-            json_end = content.rindex("}") + 1
-            content = content[json_start:json_end]
-
-        data = json.loads(content)
-        name = data.get("name") or regex_name  # Prefer LLM, fallback to regex
-        email = data.get("email") or regex_email
+        # The router already extracted identity alongside the intent when it classified this message
+        prefetched = state.get("extracted_identity")
+        if prefetched and prefetched["query"] == user_content:
+            extracted_name, extracted_email = prefetched["name"], prefetched["email"]
+        else:
+            # Name and email come from the user's latest replies; the static prompt stays the cacheable prefix
+            recent = [m for m in state["messages"] if isinstance(m, HumanMessage)][-2:]
+            extracted = await _identity_extractor().ainvoke([system_message(IDENTITY_EXTRACT_SYSTEM_PROMPT), *recent])
+            if extracted is None:
+                raise OutputParserException("No identity returned")
+            extracted_name, extracted_email = extracted.name, extracted.email
+
+        name = extracted_name or regex_name  # Prefer LLM, fallback to regex
+        email = extracted_email or regex_email
 
         # Only update if we found new values (don't overwrite with None)
         updates = {}
@@ -83,15 +201,15 @@ IMPORTANT:
         if email:
             updates["user_email"] = email
 
-        return {**state, **updates}
-    except Exception:
+        return updates
+    except OutputParserException:
         # Use regex results if LLM failed
         updates = {}
         if regex_name:
             updates["user_name"] = regex_name
         if regex_email:
             updates["user_email"] = regex_email
-        return {**state, **updates} if updates else state
+        return updates
 
 
 def ask_for_time_preference(state: AgentState) -> AgentState:
@@ -104,49 +222,28 @@ def ask_for_time_preference(state: AgentState) -> AgentState:
         "Do you have a preferred day or time for your appointment? "
         "For example, 'Tuesday afternoon' or 'Wednesday morning'. Or just say 'any' if you're flexible!"
     )
-    return {**state, "messages": [AIMessage(content=msg)], "asked_for_preference": True}
+    return {"messages": [AIMessage(content=msg)], "asked_for_preference": True}
 
 
-def parse_time_preference(state: AgentState) -> AgentState:
+@lru_cache(maxsize=1024)
+def _encode_preference(user_input: str) -> str:
     """
-    Parse natural language time preferences into structured data.
-
-    Extracts:
-    - Days of week (Monday, Tuesday...)
-    - Specific hours (11am, 2pm)
-    - General times (morning, afternoon, evening)
+    Encode a folded (stripped, casefolded) reply as "tuesday,wednesday|hour:11", "monday|morning" or "any".
 
-    Falls back to 'any' if input is ambiguous like "anytime".
+    Pure function of the text, so repeated answers ("any", "tuesday afternoon") are served from the cache.
     """
-    last_user_msg = next((m for m in reversed(state["messages"]) if isinstance(m, HumanMessage)), None)
-    if not last_user_msg:
-        return state
-
-    user_input = last_user_msg.content.strip().lower()
-
-    # Check if user says "any"
-    if any(word in user_input for word in ["any", "anytime", "flexible"]):
-        return {**state, "time_preference": "any"}
-
-    # Extract ALL days mentioned
-    days_map = {
-        "monday": ["monday", "mon"],
-        "tuesday": ["tuesday", "tues", "tue"],
-        "wednesday": ["wednesday", "wed"],
-        "thursday": ["thursday", "thurs", "thu"],
-        "friday": ["friday", "fri"],
-        "saturday": ["saturday", "sat"],
-        "sunday": ["sunday", "sun"],
-    }
-
-    found_days = []
-    for day, keywords in days_map.items():
-        if any(kw in user_input for kw in keywords):
-            found_days.append(day)
+    # Check if user says "any" ("anytime" contains it)
+    if "any" in user_input or "flexible" in user_input:
+        return "any"
+
+    # Extract ALL days mentioned, in weekday order
+    day_mask = 0
+    for day in DAY_RE.findall(user_input):
+        day_mask |= _DAY_BITS[day[:3]]
+    found_days = [day for i, day in enumerate(WEEKDAYS) if day_mask >> i & 1]
 
     # Extract specific time (11 am, 2:30 pm, etc.)
-    time_pattern = r"(\d{1,2})(?::(\d{2}))?\s*(am|pm)?"
-    time_matches = re.findall(time_pattern, user_input)
+    time_matches = TIME_RE.findall(user_input)
 
     specific_hour = None
     if time_matches:
@@ -160,21 +257,19 @@ def parse_time_preference(state: AgentState) -> AgentState:
         elif period == "am" and hour == 12:
             hour = 0
 
-        specific_hour = hour
+        # "in 45 minutes" is not an hour of the day
+        if hour < 24:
+            specific_hour = hour
 
     # Extract general time
     general_time = None
     if not specific_hour:
-        if "morning" in user_input or "am" in user_input:
-            general_time = "morning"
-        elif "afternoon" in user_input or "pm" in user_input:
-            general_time = "afternoon"
-        elif "evening" in user_input:
-            general_time = "evening"
+        found = {match.lastgroup for match in PART_OF_DAY_RE.finditer(user_input)}
+        general_time = next((part for part in PART_OF_DAY_PRIORITY if part in found), None)
 
     # Build preference: "tuesday,wednesday|11" or "monday|morning" or "any"
     if not found_days and not specific_hour and not general_time:
-        return {**state, "time_preference": "any"}
+        return "any"
 
     pref_parts = []
     if found_days:
@@ -184,22 +279,48 @@ def parse_time_preference(state: AgentState) -> AgentState:
     elif general_time:
         pref_parts.append(general_time)
 
-    preference = "|".join(pref_parts) if pref_parts else "any"
-    print(f"📅 User preference: {preference}")
-    return {**state, "time_preference": preference}
+    return "|".join(pref_parts) if pref_parts else "any"
 
 
-def ask_for_name_email(state: AgentState) -> AgentState:
-    """Ask user to provide missing name or email."""
+def parse_time_preference(state: AgentState) -> AgentState:
+    """
+    Parse natural language time preferences into structured data.
+
+    Extracts:
+    - Days of week (Monday, Tuesday...)
+    - Specific hours (11am, 2pm)
+    - General times (morning, afternoon, evening)
+
+    Falls back to 'any' if input is ambiguous like "anytime".
+    """
+    user_content = last_user_content(state)
+    if user_content is None:
+        return {}
+
+    preference = _encode_preference(fold_text(user_content))
+    logger.debug("User preference: %s", preference)
+    return {"time_preference": preference}
+
+
+def _missing_identity_prompt(has_name: bool, has_email: bool) -> str:
+    """The reply for one identity combination; evaluated once per combination to build _MISSING_IDENTITY_PROMPTS."""
     missing = []
-    if not state.get("user_name"):
+    if not has_name:
         missing.append("full name")
-    if not state.get("user_email"):
+    if not has_email:
         missing.append("email address")
+    return f"To complete your booking, I'll need your {' and '.join(missing)}. Could you please provide that?"
 
-    msg = f"To complete your booking, I'll need your {' and '.join(missing)}. Could you please provide that?"
 
-    return {**state, "messages": [AIMessage(content=msg)]}
+# (has_name, has_email) -> the request for whatever is still missing
+_MISSING_IDENTITY_PROMPTS = {flags: _missing_identity_prompt(*flags) for flags in product((False, True), repeat=2)}
+
+
+def ask_for_name_email(state: AgentState) -> AgentState:
+    """Ask user to provide missing name or email."""
+    msg = _MISSING_IDENTITY_PROMPTS[(bool(state.get("user_name")), bool(state.get("user_email")))]
+
+    return {"messages": [AIMessage(content=msg)]}
 
 
 def booking_check_availability(state: AgentState) -> AgentState:
@@ -213,20 +334,18 @@ def booking_check_availability(state: AgentState) -> AgentState:
     4. Limit results to preventing overwhelming the user.
     """
     try:
-        client = CalendlyClient()
-        event_types = client.get_event_types()
-        event_type_uri = event_types[0]["uri"]
+        index = _available_times(_event_type_uri())
 
-        slots = client.get_available_times(event_type_uri)
+        if not index.entries:
+            return {"error": "No available slots found."}
 
-        if not slots:
-            return {**state, "error": "No available slots found."}
+        entries, timed, by_day = index.entries, index.timed, index.by_day
 
         # Parse preference: "tuesday,wednesday|hour:11" or "monday|morning" or "any"
         preference = state.get("time_preference", "any")
 
         if preference == "any":
-            display_slots = slots[:10]
+            display_entries = entries[:MAX_SLOTS_SHOWN]
             msg_header = "Here are the next available appointment slots:"
         else:
             # Parse preference components
@@ -241,81 +360,74 @@ def booking_check_availability(state: AgentState) -> AgentState:
                 else:
                     general_time = parts[1]
 
-            # Try exact match first (specific day + specific hour)
+            if requested_days:
+                # Each day's list is chronological, so merging keeps the overall slot order
+                candidates = heapq.merge(*(by_day.get(day, []) for day in requested_days), key=itemgetter(0))
+            else:
+                candidates = timed
+
+            # Try exact match first (specific day + specific hour). Only the first MAX_SLOTS_SHOWN
+            # of either list are ever shown, so stop once enough exact matches are in.
             exact_matches = []
             fallback_matches = []
 
-            for slot in slots:
-                try:
-                    dt = datetime.fromisoformat(slot["start_time"].replace("Z", "+00:00"))
-                    day_name = dt.strftime("%A").lower()
-                    hour = dt.hour
-
-                    # Check day match
-                    day_match = not requested_days or day_name in requested_days
-
-                    if day_match:
-                        if specific_hour is not None:
-                            # Exact hour match
-                            if hour == specific_hour:
-                                exact_matches.append(slot)
-                            # Fallback: morning/afternoon/evening based on requested hour
-                            elif specific_hour < 12 and 6 <= hour < 12:
-                                fallback_matches.append(slot)
-                            elif 12 <= specific_hour < 17 and 12 <= hour < 17:
-                                fallback_matches.append(slot)
-                        elif general_time:
-                            # General time match
-                            if (
-                                (general_time == "morning" and 6 <= hour < 12)
-                                or (general_time == "afternoon" and 12 <= hour < 17)
-                                or (general_time == "evening" and 17 <= hour < 21)
-                            ):
-                                exact_matches.append(slot)
-                        else:
-                            # Just day match
-                            exact_matches.append(slot)
-                except Exception:
-                    continue
+            fallback_bucket = FALLBACK_BUCKETS[specific_hour] if specific_hour is not None else None
+
+            for entry in candidates:
+                hour = entry[0].hour
+                bucket = HOUR_BUCKETS[hour]
+                if specific_hour is not None:
+                    # Exact hour match
+                    if hour == specific_hour:
+                        exact_matches.append(entry)
+                    # Fallback: morning/afternoon based on requested hour
+                    elif fallback_bucket and bucket == fallback_bucket and len(fallback_matches) < MAX_SLOTS_SHOWN:
+                        fallback_matches.append(entry)
+                elif general_time:
+                    # General time match
+                    if bucket == general_time:
+                        exact_matches.append(entry)
+                else:
+                    # Just day match
+                    exact_matches.append(entry)
+                if len(exact_matches) == MAX_SLOTS_SHOWN:
+                    break
 
             # Decide what to show
             if exact_matches:
-                display_slots = exact_matches[:10]
+                display_entries = exact_matches
                 days_str = ", ".join(requested_days) if requested_days else "any day"
                 if specific_hour is not None:
-                    time_str = f"{specific_hour % 12 or 12} {'AM' if specific_hour < 12 else 'PM'}"
+                    time_str = HOUR_LABELS[specific_hour]
                     msg_header = f"Here are slots for {days_str} at {time_str}:"
                 elif general_time:
                     msg_header = f"Here are {general_time} slots for {days_str}:"
                 else:
                     msg_header = f"Here are slots for {days_str}:"
             elif fallback_matches:
-                display_slots = fallback_matches[:10]
+                display_entries = fallback_matches
                 days_str = ", ".join(requested_days) if requested_days else "those days"
-                time_str = f"{specific_hour % 12 or 12} {'AM' if specific_hour < 12 else 'PM'}"
-                fallback_time = "morning" if specific_hour < 12 else "afternoon"
-                msg_header = f"I don't have {time_str} available, but here are {fallback_time} times for {days_str}:"
+                msg_header = (
+                    f"I don't have {HOUR_LABELS[specific_hour]} available, "
+                    f"but here are {fallback_bucket} times for {days_str}:"
+                )
             else:
                 # No matches at all - show all available
-                display_slots = slots[:10]
+                display_entries = entries[:MAX_SLOTS_SHOWN]
                 msg_header = "No slots found for your preference. Here are all available times:"
 
-        # Format slots
-        formatted_slots = []
-        for i, slot in enumerate(display_slots, 1):
-            start_time = slot.get("start_time", "")
-            try:
-                dt = datetime.fromisoformat(start_time.replace("Z", "+00:00"))
-                formatted_time = dt.strftime("%A, %B %d at %I:%M %p UTC")
-                formatted_slots.append(f"{i}. {formatted_time}")
-            except Exception:
-                formatted_slots.append(f"{i}. {start_time}")
+        # Format slots (only the ones shown)
+        display_slots = [slot for _, slot in display_entries]
+        slot_lines = "\n".join(
+            f"{i}. {format_appointment_time(dt) + ' UTC' if dt else slot.get('start_time', '')}"
+            for i, (dt, slot) in enumerate(display_entries, 1)
+        )
 
-        msg = f"{msg_header}\n\n{chr(10).join(formatted_slots)}\n\nReply with the slot number to book (e.g., '2')."
+        msg = f"{msg_header}\n\n{slot_lines}\n\nReply with the slot number to book (e.g., '2')."
 
-        return {**state, "messages": [AIMessage(content=msg)], "available_slots": display_slots, "error": None}
+        return {"messages": [AIMessage(content=msg)], "available_slots": display_slots, "error": None}
     except Exception as e:
-        return {**state, "error": f"ERROR: {str(e)}"}
+        return {"error": f"ERROR: {str(e)}"}
 
 
 def parse_slot_selection(state: AgentState) -> AgentState:
@@ -327,28 +439,28 @@ def parse_slot_selection(state: AgentState) -> AgentState:
     - Invalid integer (out of range): Returns error message to retry.
     - Text input (e.g. "actually tuesday"): Clears 'available_slots' to trigger re-parsing of preference.
     """
-    last_user_msg = next((m for m in reversed(state["messages"]) if isinstance(m, HumanMessage)), None)
-    if not last_user_msg or not state.get("available_slots"):
-        return state
+    user_content = last_user_content(state)
+    if user_content is None or not state.get("available_slots"):
+        return {}
 
-    user_input = last_user_msg.content.strip()
+    user_input = user_content.strip()
 
-    # Try to parse as a number
-    try:
-        slot_num = int(user_input)
-        if 1 <= slot_num <= len(state["available_slots"]):
-            selected = state["available_slots"][slot_num - 1]
-            selected_time = selected.get("start_time")
-            print(f"✅ User selected slot {slot_num}: {selected_time}")
-            # DON'T add a message - just set the slot and let routing handle it
-            return {**state, "selected_slot": selected_time}
-        else:
-            msg = f"Please choose a number between 1 and {len(state['available_slots'])}."
-            return {**state, "messages": [AIMessage(content=msg)]}
-    except ValueError:
-        # User didn't type a number - assume they are changing preference
-        # We clear available_slots to trigger re-route to parsing
-        return {**state, "available_slots": None, "messages": []}
+    # User didn't type a number - assume they are changing preference
+    # We clear available_slots to trigger re-route to parsing
+    # (isdecimal accepts exactly the digit strings int() does, without raising on text)
+    if not user_input.isdecimal():
+        return {"available_slots": None, "messages": []}
+
+    slot_num = int(user_input)
+    if 1 <= slot_num <= len(state["available_slots"]):
+        selected = state["available_slots"][slot_num - 1]
+        selected_time = selected.get("start_time")
+        logger.debug("User selected slot %d: %s", slot_num, selected_time)
+        # DON'T add a message - just set the slot and let routing handle it
+        return {"selected_slot": selected_time}
+
+    msg = f"Please choose a number between 1 and {len(state['available_slots'])}."
+    return {"messages": [AIMessage(content=msg)]}
 
 
 def booking_create(state: AgentState) -> AgentState:
@@ -362,7 +474,7 @@ def booking_create(state: AgentState) -> AgentState:
     - Returns success message and resets flow to IDLE.
     """
     if not state.get("selected_slot") or not state.get("user_name") or not state.get("user_email"):
-        return {**state, "booking_stage": "ERROR", "error": "Missing required information for booking"}
+        return {"booking_stage": "ERROR", "error": "Missing required information for booking"}
 
     try:
         result = create_booking.invoke(
@@ -370,7 +482,11 @@ def booking_create(state: AgentState) -> AgentState:
         )
 
         if result.startswith("ERROR"):
-            return {**state, "booking_stage": "ERROR", "error": result}
+            return {"booking_stage": "ERROR", "error": result}
+
+        # The booked slot is gone; don't offer it from the cache again
+        with _slots_lock:
+            _slots_cache.clear()
 
         # Check if this was a reschedule -> Cancel the old event
         reschedule_msg = ""
@@ -378,8 +494,7 @@ def booking_create(state: AgentState) -> AgentState:
         if state.get("flow") == "RESCHEDULE" and state.get("selected_event_uri"):
             try:
                 # Cancel the old event
-                client = CalendlyClient()
-                _ = client.cancel_event(state["selected_event_uri"], reason="Rescheduled to new time")
+                _ = get_client().cancel_event(state["selected_event_uri"], reason="Rescheduled to new time")
                 reschedule_msg = "\n\n♻️ Your previous appointment has been successfully cancelled."
             except Exception as e:
                 reschedule_msg = (
@@ -389,7 +504,6 @@ def booking_create(state: AgentState) -> AgentState:
         # SUCCESS: Clear booking state to prevent re-routing loops
         # Reset flow to IDLE
         return {
-            **state,
             "messages": [AIMessage(content=result + reschedule_msg)],
             "flow": "IDLE",
             "intent": None,
@@ -402,10 +516,10 @@ def booking_create(state: AgentState) -> AgentState:
             "selected_event_uri": None,
         }
     except Exception as e:
-        return {**state, "booking_stage": "ERROR", "error": f"ERROR: {str(e)}"}
+        return {"booking_stage": "ERROR", "error": f"ERROR: {str(e)}"}
 
 
 def confirm_booking(state: AgentState) -> AgentState:
     """Generate booking confirmation message."""
     # Confirmation is handled in booking_create
-    return state
+    return {}
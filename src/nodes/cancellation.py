@@ -1,10 +1,20 @@
-import re
 from datetime import datetime
 
-from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.messages import AIMessage
 
-from src.calendly_client import CalendlyClient
+from src.calendly_client import get_client
+from src.nodes.utils import find_email, fold_text, last_user_content
 from src.state import AgentState
+from src.timeutils import format_appointment_time
+
+
+def _format_booking_time(booking: dict) -> str:
+    """Display form of a scheduled event's start time; unparseable values are shown verbatim."""
+    start_time = booking.get("start_time", "")
+    try:
+        return format_appointment_time(datetime.fromisoformat(start_time))
+    except (TypeError, ValueError):
+        return start_time
 
 
 def lookup_events(state: AgentState) -> AgentState:
@@ -22,63 +32,45 @@ def lookup_events(state: AgentState) -> AgentState:
     flow = state.get("flow")
 
     # Check for new email in user message first (allows correction)
-    last_user_msg = next((m for m in reversed(state["messages"]) if isinstance(m, HumanMessage)), None)
-    new_email = None
-    if last_user_msg:
-        email_pattern = r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b"
-        emails = re.findall(email_pattern, last_user_msg.content)
-        if emails:
-            new_email = emails[0]
+    user_content = last_user_content(state)
+    new_email = find_email(user_content) if user_content is not None else None
 
     # Prioritize new email, then stored lookup, then user profile
     email = new_email or state.get("lookup_email") or state.get("user_email")
 
     if not email:
-        last_user_msg = next((m for m in reversed(state["messages"]) if isinstance(m, HumanMessage)), None)
-        if not last_user_msg:
-            return state
-
-        email_pattern = r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b"
-        emails = re.findall(email_pattern, last_user_msg.content)
-
-        if not emails:
-            action = "reschedule" if flow == "RESCHEDULE" else "cancel"
-            msg = f"To {action} your appointment, please provide your email address."
-            return {**state, "messages": [AIMessage(content=msg)]}
+        # The latest message had no email either (new_email would have caught it)
+        if user_content is None:
+            return {}
 
-        email = emails[0]
+        action = "reschedule" if flow == "RESCHEDULE" else "cancel"
+        msg = f"To {action} your appointment, please provide your email address."
+        return {"messages": [AIMessage(content=msg)]}
 
     try:
-        client = CalendlyClient()
-        bookings = client.list_scheduled_events(email)
+        bookings = get_client().list_scheduled_events(email)
 
         if not bookings:
             msg = f"I couldn't find any upcoming appointments for {email}."
             # Don't persist invalid email if we just found it
-            return {**state, "messages": [AIMessage(content=msg)], "lookup_email": None if new_email else email}
+            return {"messages": [AIMessage(content=msg)], "lookup_email": None if new_email else email}
 
         # Format bookings
-        booking_list = []
-        for i, booking in enumerate(bookings, 1):
-            start_time = booking.get("start_time", "")
-            try:
-                dt = datetime.fromisoformat(start_time.replace("Z", "+00:00"))
-                formatted_time = dt.strftime("%A, %B %d at %I:%M %p")
-                booking_list.append(f"{i}. {formatted_time}")
-            except Exception:
-                booking_list.append(f"{i}. {start_time}")
+        booking_times = [_format_booking_time(booking) for booking in bookings]
 
         action_prompt = "cancel" if flow == "CANCEL" else "reschedule"
 
         if len(bookings) == 1:
-            appt_time = booking_list[0].split(". ", 1)[1]
-            msg = f"Found your appointment on **{appt_time}**.\n\nIs this the one you want to {action_prompt}? (Yes/No)"
+            msg = (
+                f"Found your appointment on **{booking_times[0]}**.\n\n"
+                f"Is this the one you want to {action_prompt}? (Yes/No)"
+            )
         else:
-            msg = "Found these appointments:\n\n" + "\n".join(booking_list)
+            booking_lines = "\n".join(f"{i}. {formatted_time}" for i, formatted_time in enumerate(booking_times, 1))
+            msg = "Found these appointments:\n\n" + booking_lines
             msg += f"\n\nWhich one would you like to {action_prompt}? Reply with the number (1-{len(bookings)})."
 
         return {
-            **state,
             "messages": [AIMessage(content=msg)],
             "lookup_email": None if new_email else email,
             "matched_events": bookings,
@@ -88,7 +80,7 @@ def lookup_events(state: AgentState) -> AgentState:
         }
     except Exception as e:
         msg = f"Error looking up appointments: {str(e)}"
-        return {**state, "messages": [AIMessage(content=msg)], "error": str(e)}
+        return {"messages": [AIMessage(content=msg)], "error": str(e)}
 
 
 def select_event(state: AgentState) -> AgentState:
@@ -103,11 +95,11 @@ def select_event(state: AgentState) -> AgentState:
       - CANCEL -> confirm_action
       - RESCHEDULE -> booking flow (clears old slots/preferences)
     """
-    last_user_msg = next((m for m in reversed(state["messages"]) if isinstance(m, HumanMessage)), None)
-    if not last_user_msg:
-        return state
+    user_content = last_user_content(state)
+    if user_content is None:
+        return {}
 
-    response = last_user_msg.content.strip().lower()
+    response = fold_text(user_content)
     bookings = state.get("matched_events", [])
     flow = state.get("flow")
 
@@ -118,34 +110,30 @@ def select_event(state: AgentState) -> AgentState:
             selected_booking = bookings[0]
         else:
             msg = "Okay, let me know if you need anything else."
-            return {**state, "messages": [AIMessage(content=msg)], "intent": None, "flow": "IDLE"}
+            return {"messages": [AIMessage(content=msg)], "intent": None, "flow": "IDLE"}
     else:
-        # Multiple bookings
-        try:
-            selection = int(response)
-            if 1 <= selection <= len(bookings):
-                selected_booking = bookings[selection - 1]
-            else:
-                msg = f"Please choose a number between 1 and {len(bookings)}."
-                return {**state, "messages": [AIMessage(content=msg)]}
-        except ValueError:
+        # Multiple bookings; a sentence is the common non-number reply, so test for digits
+        # rather than let int() raise
+        if not response.isdecimal():
             msg = f"Please reply with a number (1-{len(bookings)}) to select the appointment."
-            return {**state, "messages": [AIMessage(content=msg)]}
+            return {"messages": [AIMessage(content=msg)]}
+
+        selection = int(response)
+        if 1 <= selection <= len(bookings):
+            selected_booking = bookings[selection - 1]
+        else:
+            msg = f"Please choose a number between 1 and {len(bookings)}."
+            return {"messages": [AIMessage(content=msg)]}
 
     if selected_booking:
         uri = selected_booking["uri"]
 
         if flow == "CANCEL":
             # Ask for final confirmation
-            start_time = selected_booking.get("start_time", "")
-            try:
-                dt = datetime.fromisoformat(start_time.replace("Z", "+00:00"))
-                formatted_time = dt.strftime("%A, %B %d at %I:%M %p")
-            except Exception:
-                formatted_time = start_time
+            formatted_time = _format_booking_time(selected_booking)
 
             msg = f"You selected: {formatted_time}\n\nAre you sure you want to cancel this appointment? (Yes/No)"
-            return {**state, "messages": [AIMessage(content=msg)], "selected_event_uri": uri}
+            return {"messages": [AIMessage(content=msg)], "selected_event_uri": uri}
 
         elif flow == "RESCHEDULE":
             # Transition to booking flow
@@ -155,7 +143,6 @@ def select_event(state: AgentState) -> AgentState:
                 "When would you like to reschedule this to? (e.g. 'Tuesday morning' or 'Feb 5th')"
             )
             return {
-                **state,
                 "messages": [AIMessage(content=msg)],
                 "selected_event_uri": uri,
                 "user_name": user_name,
@@ -164,28 +151,26 @@ def select_event(state: AgentState) -> AgentState:
                 "selected_slot": None,
             }
 
-    return state
+    return {}
 
 
 def confirm_action(state: AgentState) -> AgentState:
     """Confirm and execute cancellation."""
-    last_user_msg = next((m for m in reversed(state["messages"]) if isinstance(m, HumanMessage)), None)
-    if not last_user_msg:
-        return state
+    user_content = last_user_content(state)
+    if user_content is None:
+        return {}
 
-    response = last_user_msg.content.strip().lower()
+    response = fold_text(user_content)
 
     if response in ["yes", "y", "confirm", "sure"]:
         # Execute Cancellation
         if not state.get("selected_event_uri"):
-            return state
+            return {}
 
         try:
-            client = CalendlyClient()
-            _ = client.cancel_event(state["selected_event_uri"])
+            _ = get_client().cancel_event(state["selected_event_uri"])
             msg = "✅ Your appointment has been successfully canceled."
             return {
-                **state,
                 "messages": [AIMessage(content=msg)],
                 "flow": "IDLE",
                 "intent": None,
@@ -195,11 +180,10 @@ def confirm_action(state: AgentState) -> AgentState:
             }
         except Exception as e:
             msg = f"Error cancelling appointment: {str(e)}"
-            return {**state, "messages": [AIMessage(content=msg)], "error": str(e)}
+            return {"messages": [AIMessage(content=msg)], "error": str(e)}
     else:
         msg = "No problem! Your appointment remains scheduled."
         return {
-            **state,
             "messages": [AIMessage(content=msg)],
             "flow": "IDLE",
             "intent": None,
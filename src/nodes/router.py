@@ -1,94 +1,120 @@
-from langchain_core.messages import HumanMessage, SystemMessage
-
-from src.llm import get_llm
+import asyncio
+import re
+from functools import lru_cache
+from typing import Literal
+
+from langchain_core.exceptions import OutputParserException
+from langchain_core.messages import HumanMessage
+from pydantic import BaseModel, Field
+
+from src.llm import get_llm, system_message
+from src.nodes.faq import prefetch_faq
+from src.nodes.utils import find_last_user_content, fold_text, last_user_content
+from src.prompts import ROUTER_SYSTEM_PROMPT
 from src.state import AgentState
 
+# Keyword fast path, scanned in a single pass. At a given position the alternatives are tried in
+# group order, so "reschedule" wins over its "schedule" substring. Across the message, priority
+# is CANCEL > RESCHEDULE > BOOK > FAQ.
+INTENT_PRIORITY = ("CANCEL", "RESCHEDULE", "BOOK", "FAQ")
+INTENT_RE = re.compile(
+    r"(?P<CANCEL>cancel|cancellation|delete|remove)"
+    r"|(?P<RESCHEDULE>reschedule|change|move)"
+    r"|(?P<BOOK>book|appointment|schedule|slot|available|checkup|check-up)"
+    r"|(?P<FAQ>\b(?:prices?|costs?|fees?|hours|open(?:ing)?|insurance|services?|polic(?:y|ies)|payment|parking"
+    r"|address|location)\b)"
+)
+# Only a message that is nothing but a greeting skips the LLM.
+GREETING_RE = re.compile(r"(?:hi|hello|hey|good (?:morning|afternoon|evening)|thanks|thank you)\W*")
+
+
+def _classify_keywords(content_lower: str) -> str | None:
+    """Highest-priority keyword intent in a lowercased message, or None if nothing matches."""
+    found = {match.lastgroup for match in INTENT_RE.finditer(content_lower)}
+    return next((intent for intent in INTENT_PRIORITY if intent in found), None)
+
+
+class RouterDecision(BaseModel):
+    """Intent of the user's message, plus any identity details it states."""
+
+    intent: Literal["BOOK", "CANCEL", "RESCHEDULE", "FAQ", "GENERAL"]
+    name: str | None = Field(default=None, description="The user's full name, if stated")
+    email: str | None = Field(default=None, description="The user's email address, if stated")
+
+
+@lru_cache(maxsize=1)
+def _router_classifier():
+    """
+    Chat model bound to the RouterDecision schema.
+
+    The identity fields ride along with the classification so a booking opened by a message like
+    "I'm Jane Doe, jane@x.com, can I come in?" doesn't need a second extraction call. The reply is
+    not token-capped: the schema already bounds it, and a cap that cut off a long name or email
+    would surface as a provider error (OpenAI's LengthFinishReasonError), not a parse failure.
+    """
+    llm = get_llm(temperature=0, latency_optimized=True)
+    return llm.with_structured_output(RouterDecision)
+
 
 def check_existing_flow(state: AgentState) -> AgentState:
     """Entry node - check if we're already in a booking flow."""
     flow = state.get("flow", "IDLE")
 
+    # Record this turn's user message once; downstream nodes read it from state
+    user_content = find_last_user_content(state["messages"])
+    update = {"last_user_content": user_content}
+
     # If IDLE, standard routing applies
     if flow == "IDLE":
-        return state
+        return update
 
     # If in active flow, check for interrupts (intent changes)
-    last_user_msg = next((m for m in reversed(state["messages"]) if isinstance(m, HumanMessage)), None)
-    if last_user_msg:
-        content_lower = last_user_msg.content.lower()
-
-        # Keywords (must match router logic)
-        cancel_keywords = ["cancel", "cancellation", "delete", "remove"]
-        book_keywords = ["book", "appointment", "schedule", "slot", "available", "checkup", "check-up"]
-
-        new_flow = None
-        new_intent = None
-
-        # Check CANCEL
-        if any(keyword in content_lower for keyword in cancel_keywords):
-            new_flow = "CANCEL"
-            new_intent = "CANCEL"
-
-        # Check RESCHEDULE (params override Book)
-        elif "reschedule" in content_lower or "change" in content_lower or "move" in content_lower:
-            new_flow = "RESCHEDULE"
-            new_intent = "RESCHEDULE"
-
-        # Check BOOK
-        elif any(keyword in content_lower for keyword in book_keywords):
-            new_flow = "BOOK"
-            new_intent = "BOOK"
+    if user_content is not None:
+        # Same keyword scan as the router; FAQ questions don't interrupt a flow
+        new_flow = _classify_keywords(fold_text(user_content))
 
         # If we detected a valid flow change, apply it
-        if new_flow and new_flow != flow:
+        if new_flow and new_flow != "FAQ" and new_flow != flow:
             # We specifically want to allow switching, so we return the new state
             # which will be picked up by route_from_entry
-            return {**state, "flow": new_flow, "intent": new_intent}
+            return {**update, "flow": new_flow, "intent": new_flow}
 
     # If no interrupt, continue existing flow
-    return state
+    return update
 
 
-def router(state: AgentState) -> AgentState:
+async def router(state: AgentState) -> AgentState:
     """Classify user intent: BOOK, FAQ, or GENERAL."""
 
-    # Quick keyword check first - if user says "book" or "appointment", it's BOOK
-    last_user_msg = next((m for m in reversed(state["messages"]) if isinstance(m, HumanMessage)), None)
-    if last_user_msg:
-        content_lower = last_user_msg.content.lower()
-        book_keywords = ["book", "appointment", "schedule", "slot", "available", "checkup", "check-up"]
-        cancel_keywords = ["cancel", "cancellation", "delete", "remove"]
-
-        if any(keyword in content_lower for keyword in cancel_keywords):
-            return {**state, "intent": "CANCEL", "flow": "CANCEL"}
-
-        # Check RESCHEDULE before BOOK to prevent "schedule" keyword conflict
-        # "reschedule" contains "schedule", so specific check first
-        if "reschedule" in content_lower or "change" in content_lower or "move" in content_lower:
-            return {**state, "intent": "RESCHEDULE", "flow": "RESCHEDULE"}
-
-        if any(keyword in content_lower for keyword in book_keywords) or content_lower in ["yes", "y", "sure", "yeah"]:
-            return {**state, "intent": "BOOK", "flow": "BOOK"}
-
-    llm = get_llm(temperature=0)
+    # Quick keyword check first - only unmatched messages pay for an LLM call
+    user_content = last_user_content(state)
+    if user_content is not None:
+        content_lower = fold_text(user_content)
+        intent = _classify_keywords(content_lower)
 
-    system_prompt = """Classify user intent:
-- BOOK: mentions booking, appointment, slots, availability
-- CANCEL: mentions cancel, cancellation, delete appointment
-- RESCHEDULE: mentions reschedule, change appointment time, move appointment
-- FAQ: asks about prices, hours, services, policies
-- GENERAL: greetings only
+        if intent == "FAQ":
+            return {"intent": "FAQ", "flow": "IDLE"}
+        if intent:
+            return {"intent": intent, "flow": intent}
+        if content_lower in ["yes", "y", "sure", "yeah"]:
+            return {"intent": "BOOK", "flow": "BOOK"}
+        if GREETING_RE.fullmatch(content_lower):
+            return {"intent": "GENERAL", "flow": "IDLE"}
 
-ONE WORD: BOOK, CANCEL, RESCHEDULE, FAQ, or GENERAL"""
+    if user_content is None:
+        return {"intent": "GENERAL"}
 
-    if not last_user_msg:
-        return {**state, "intent": "GENERAL"}
+    # Speculatively retrieve FAQ context while classifying; handle_faq picks it up if the intent
+    # turns out to be FAQ, otherwise it is simply ignored.
+    decision, faq_prefetch = await asyncio.gather(
+        _classify_with_llm(user_content),
+        prefetch_faq(user_content),
+    )
 
-    response = llm.invoke([SystemMessage(content=system_prompt), HumanMessage(content=last_user_msg.content)])
+    if decision is None:
+        return {"intent": "GENERAL", "flow": "IDLE", "faq_prefetch": faq_prefetch}
 
-    intent = response.content.strip().upper()
-    if intent not in ["BOOK", "CANCEL", "RESCHEDULE", "FAQ", "GENERAL"]:
-        intent = "GENERAL"
+    intent = decision.intent
 
     # Sync flow with intent
     flow = "IDLE"
@@ -99,4 +125,23 @@ ONE WORD: BOOK, CANCEL, RESCHEDULE, FAQ, or GENERAL"""
     elif intent == "RESCHEDULE":
         flow = "RESCHEDULE"
 
-    return {**state, "intent": intent, "flow": flow}
+    # booking_collect_identity reuses this instead of running its own extraction for the message
+    extracted_identity = {"query": user_content, "name": decision.name, "email": decision.email}
+
+    return {
+        "intent": intent,
+        "flow": flow,
+        "faq_prefetch": faq_prefetch,
+        "extracted_identity": extracted_identity,
+    }
+
+
+async def _classify_with_llm(user_content: str) -> RouterDecision | None:
+    """Structured classification of ``user_content``; None when the model's output can't be parsed."""
+    try:
+        decision = await _router_classifier().ainvoke(
+            [system_message(ROUTER_SYSTEM_PROMPT), HumanMessage(content=user_content)]
+        )
+    except OutputParserException:
+        return None
+    return decision
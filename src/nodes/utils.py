@@ -1,7 +1,57 @@
-from langchain_core.messages import AIMessage
+import re
+from functools import lru_cache
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
 
 from src.state import AgentState
 
+# Shared by the booking and cancellation flows.
+EMAIL_RE = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
+
+
+def find_email(text: str) -> str | None:
+    """First email address in ``text``; the regex only runs when an "@" is present at all."""
+    if "@" not in text:
+        return None
+    match = EMAIL_RE.search(text)
+    return match.group() if match else None
+
+
+def find_last_user_content(messages: list[BaseMessage]) -> str | None:
+    """
+    Content of the most recent user message in ``messages``.
+
+    The newest human turn is almost always the last message, or the one before it when a node has
+    already replied, so those are checked before scanning the rest of the history.
+    """
+    for message in messages[-1:-3:-1]:
+        if isinstance(message, HumanMessage):
+            return message.content
+    last_user_msg = next((m for m in reversed(messages[:-2]) if isinstance(m, HumanMessage)), None)
+    return last_user_msg.content if last_user_msg else None
+
+
+@lru_cache(maxsize=256)
+def fold_text(text: str) -> str:
+    """
+    Stripped, casefolded form of a user message for keyword matching.
+
+    Memoised because the entry node, the router and the flow nodes all fold the same message.
+    """
+    return text.strip().casefold()
+
+
+def last_user_content(state: AgentState) -> str | None:
+    """
+    Content of the latest user message.
+
+    check_existing_flow records it once per turn; nodes invoked outside the graph (e.g. the router
+    eval) fall back to scanning the history.
+    """
+    if "last_user_content" in state:
+        return state["last_user_content"]
+    return find_last_user_content(state["messages"])
+
 
 def tool_error_handler(state: AgentState) -> AgentState:
     """Handle errors from tool calls."""
@@ -12,4 +62,4 @@ def tool_error_handler(state: AgentState) -> AgentState:
         "Would you like to try again or can I help you with something else?"
     )
 
-    return {**state, "messages": [AIMessage(content=msg)], "error": None}
+    return {"messages": [AIMessage(content=msg)], "error": None}
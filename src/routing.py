@@ -1,45 +1,43 @@
+from itertools import product
 from typing import Literal
 
 from src.state import AgentState
 
-
-def route_from_entry(
-    state: AgentState,
-) -> Literal[
+EntryRoute = Literal[
     "router",
     "booking_collect_identity",
     "lookup_events",
     "select_event",
     "confirm_action",
     "ask_for_time_preference",
-]:
-    """Entry point routing based on flow and intent."""
-    flow = state.get("flow", "IDLE")
-    intent = state.get("intent")
+]
 
+
+def _decide_from_entry(flow: str, intent: str | None, has_selected_event: bool, has_matched_events: bool) -> EntryRoute:
+    """The entry decision tree; evaluated once per combination to build _ENTRY_ROUTES."""
     # If we are in an active flow, route accordingly
     if flow == "BOOK":
         return "booking_collect_identity"
 
     if flow == "CANCEL":
         # If we have selected an event, we are waiting for confirmation
-        if state.get("selected_event_uri"):
+        if has_selected_event:
             return "confirm_action"
         # If we have looked up events but not selected, we are choosing
-        if state.get("matched_events"):
+        if has_matched_events:
             return "select_event"
         # Otherwise start lookup
         return "lookup_events"
 
     if flow == "RESCHEDULE":
         # If we have selected event, proceed to new booking details
-        if state.get("selected_event_uri"):
+        if has_selected_event:
             # If we already have a slot selected, we might be in booking creation,
             # but usually entry point routing implies we are waiting for user input.
             # We route to booking controller to handle identity check and next steps.
             return "booking_collect_identity"
 
-        if state.get("matched_events"):
+        if has_matched_events:
             return "select_event"
 
         return "lookup_events"
@@ -56,43 +54,62 @@ def route_from_entry(
     return "router"
 
 
-def route_after_router(
-    state: AgentState,
-) -> Literal["handle_faq", "booking_collect_identity", "lookup_events", "respond_to_user"]:
-    """Route based on classified intent."""
-    intent = state.get("intent", "GENERAL")
+# (flow, intent, has_selected_event, has_matched_events) -> next node, for every value the nodes set
+_ENTRY_ROUTES: dict[tuple[str, str | None, bool, bool], EntryRoute] = {
+    key: _decide_from_entry(*key)
+    for key in product(
+        ("IDLE", "BOOK", "CANCEL", "RESCHEDULE"),
+        (None, "BOOK", "CANCEL", "RESCHEDULE", "FAQ", "GENERAL"),
+        (False, True),
+        (False, True),
+    )
+}
+
+
+# State keys read by route_from_entry, fetched in one map(state.get, ...) pass; a key missing
+# from the state reads as None.
+_ENTRY_KEYS = ("flow", "intent", "selected_event_uri", "matched_events")
+
+
+def route_from_entry(state: AgentState) -> EntryRoute:
+    """Entry point routing based on flow and intent."""
+    flow, intent, selected_event_uri, matched_events = map(state.get, _ENTRY_KEYS)
+    key = (flow or "IDLE", intent, bool(selected_event_uri), bool(matched_events))
+    route = _ENTRY_ROUTES.get(key)
+    # Values outside the table (e.g. a hand-built state) still get the same answer
+    return route if route is not None else _decide_from_entry(*key)
 
-    if intent == "BOOK":
-        return "booking_collect_identity"
-    elif intent == "CANCEL":
-        return "lookup_events"
-    elif intent == "RESCHEDULE":
-        return "lookup_events"
-    elif intent == "FAQ":
-        return "handle_faq"
-    else:
-        return "respond_to_user"
 
+RouterRoute = Literal["handle_faq", "booking_collect_identity", "lookup_events", "respond_to_user"]
 
-def route_after_identity_check(
-    state: AgentState,
-) -> Literal[
+# Classified intent -> next node; anything else (GENERAL, unset) is a general reply
+_ROUTER_ROUTES: dict[str, RouterRoute] = {
+    "BOOK": "booking_collect_identity",
+    "CANCEL": "lookup_events",
+    "RESCHEDULE": "lookup_events",
+    "FAQ": "handle_faq",
+}
+
+
+def route_after_router(state: AgentState) -> RouterRoute:
+    """Route based on classified intent."""
+    return _ROUTER_ROUTES.get(state.get("intent"), "respond_to_user")
+
+
+IdentityRoute = Literal[
     "ask_for_name_email",
     "ask_for_time_preference",
     "parse_time_preference",
     "booking_check_availability",
     "parse_slot_selection",
     "booking_create",
-]:
-    """Check if we have name/email and route appropriately."""
-    has_identity = state.get("user_name") and state.get("user_email")
-    # has_preference = state.get("time_preference") is not None
-    # Wait, existing code:
-    asked_for_preference = state.get("asked_for_preference", False)
-    has_preference = state.get("time_preference") is not None
-    has_slots = state.get("available_slots") is not None
-    has_selection = state.get("selected_slot") is not None
+]
 
+
+def _decide_after_identity(
+    has_identity: bool, has_preference: bool, asked_for_preference: bool, has_slots: bool, has_selection: bool
+) -> IdentityRoute:
+    """The booking-step decision tree; evaluated once per combination to build _IDENTITY_ROUTES."""
     # CRITICAL: If user selected a slot, create the booking!
     if has_selection:
         return "booking_create"
@@ -116,6 +133,25 @@ def route_after_identity_check(
     return "ask_for_name_email"
 
 
+# (has_identity, has_preference, asked_for_preference, has_slots, has_selection) -> next node
+_IDENTITY_ROUTES: dict[tuple[bool, bool, bool, bool, bool], IdentityRoute] = {
+    flags: _decide_after_identity(*flags) for flags in product((False, True), repeat=5)
+}
+
+
+def route_after_identity_check(state: AgentState) -> IdentityRoute:
+    """Check if we have name/email and route appropriately."""
+    return _IDENTITY_ROUTES[
+        (
+            bool(state.get("user_name") and state.get("user_email")),
+            state.get("time_preference") is not None,
+            bool(state.get("asked_for_preference", False)),
+            state.get("available_slots") is not None,
+            state.get("selected_slot") is not None,
+        )
+    ]
+
+
 def route_after_availability_check(state: AgentState) -> Literal["tool_error_handler", "__end__"]:
     """Check if availability check succeeded - slots already presented."""
     if state.get("error"):
@@ -12,10 +12,14 @@ class AgentState(TypedDict):
     messages: Annotated[list[BaseMessage], add_messages]
     intent: str | None
     flow: Literal["IDLE", "BOOK", "CANCEL", "RESCHEDULE"]
+    # Content of this turn's user message, set once by the entry node
+    last_user_content: str | None
 
     # User Identity
     user_name: str | None
     user_email: str | None
+    # Name/email the router's classification call pulled from a message: {"query", "name", "email"}
+    extracted_identity: dict | None
 
     # Booking data
     time_preference: str | None
@@ -29,4 +33,7 @@ class AgentState(TypedDict):
     selected_event_uri: str | None
     confirmed: bool
 
+    # FAQ retrieval started speculatively by the router: {"query", "vector", "context"}
+    faq_prefetch: dict | None
+
     error: str | None
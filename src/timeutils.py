@@ -0,0 +1,34 @@
+"""Date formatting shared by the booking and cancellation replies."""
+
+from datetime import datetime
+
+WEEKDAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+MONTH_NAMES = (
+    "",
+    "January",
+    "February",
+    "March",
+    "April",
+    "May",
+    "June",
+    "July",
+    "August",
+    "September",
+    "October",
+    "November",
+    "December",
+)
+
+
+def format_appointment_time(dt: datetime) -> str:
+    """
+    Render ``dt`` as "Monday, January 07 at 09:30 AM".
+
+    Equivalent to ``dt.strftime("%A, %B %d at %I:%M %p")`` in the C locale, built from the fields
+    directly so a page of slots doesn't pay for strftime's format parsing per slot.
+    """
+    hour = dt.hour
+    return (
+        f"{WEEKDAY_NAMES[dt.weekday()]}, {MONTH_NAMES[dt.month]} {dt.day:02d} "
+        f"at {hour % 12 or 12:02d}:{dt.minute:02d} {'AM' if hour < 12 else 'PM'}"
+    )
@@ -1,19 +1,22 @@
 """LangChain tools for Calendly integration."""
 
+import logging
 from datetime import datetime
 from typing import Annotated
 
 from langchain_core.tools import tool
 
-from src.calendly_client import CalendlyClient
+from src.calendly_client import get_client
+from src.timeutils import format_appointment_time
+
+logger = logging.getLogger(__name__)
 
 
 @tool
 def get_calendly_event_type() -> str:
     """Get the URI of the dental check-up event type from Calendly."""
     try:
-        client = CalendlyClient()
-        event_types = client.get_event_types()
+        event_types = get_client().get_event_types()
 
         if not event_types:
             return "ERROR: No event types found in Calendly account."
@@ -23,11 +26,7 @@ def get_calendly_event_type() -> str:
         uri = event_type.get("uri", "")
         name = event_type.get("name", "Unknown")
 
-        # DEBUG: Print event type info
-        print("\n🔧 DEBUG - Event Type Found:")
-        print(f"   Name: {name}")
-        print(f"   URI: {uri}")
-        print(f"   Add to .env: CALENDLY_EVENT_TYPE_URI={uri}\n")
+        logger.debug("Event type found: %s (add to .env: CALENDLY_EVENT_TYPE_URI=%s)", name, uri)
 
         return uri
     except Exception as e:
@@ -42,21 +41,18 @@ def check_availability(days_ahead: Annotated[int, "Number of days from today to
     Returns a formatted string with available time slots.
     """
     try:
-        client = CalendlyClient()
-
+        client = get_client()
         # Get event type
-        event_types = client.get_event_types()
-        if not event_types:
+        event_type = client.get_booking_event_type()
+        if not event_type:
             return "ERROR: No event types configured."
 
-        event_type_uri = event_types[0]["uri"]
+        event_type_uri = event_type["uri"]
 
-        # Print debug info
-        print("\n🔧 DEBUG - Checking availability...")
-        print(f"   Event Type URI: {event_type_uri}")
+        logger.debug("Checking availability for event type %s", event_type_uri)
 
         # IMPORTANT: Pass None to use current time (not midnight)
-        # The client will default to utcnow() which prevents past-time errors
+        # The client will default to the current UTC time, which prevents past-time errors
         slots = client.get_available_times(event_type_uri, None, None)
 
         if not slots:
@@ -68,16 +64,16 @@ def check_availability(days_ahead: Annotated[int, "Number of days from today to
             start_time = slot.get("start_time", "")
             # Parse and format time nicely
             try:
-                dt = datetime.fromisoformat(start_time.replace("Z", "+00:00"))
-                formatted_time = dt.strftime("%A, %B %d at %I:%M %p UTC")
+                dt = datetime.fromisoformat(start_time)
+                formatted_time = f"{format_appointment_time(dt)} UTC"
                 formatted_slots.append(f"{i}. {formatted_time} ({start_time})")
-            except Exception:
+            except (TypeError, ValueError):
                 formatted_slots.append(f"{i}. {start_time}")
 
-        print(f"   Found {len(slots)} slots\n")
+        logger.debug("Found %d slots", len(slots))
         return "\n".join(formatted_slots)
     except Exception as e:
-        print(f"   ERROR: {str(e)}\n")
+        logger.debug("Availability check failed: %s", e)
         return f"ERROR: Failed to check availability: {str(e)}"
 
 
@@ -101,14 +97,12 @@ def create_booking(
         Confirmation message with booking details.
     """
     try:
-        client = CalendlyClient()
-
-        # Get event type AND its location configuration
-        event_types = client.get_event_types()
-        if not event_types:
+        client = get_client()
+        # Get event type AND its location configuration (the same one availability is shown for)
+        event_type = client.get_booking_event_type()
+        if not event_type:
             return "ERROR: No event types configured."
 
-        event_type = event_types[0]
         event_type_uri = event_type["uri"]
 
         # Extract location from event type config (REQUIRED by Calendly API)
@@ -1,16 +1,127 @@
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
 from langchain_core.tools import tool
-from langchain_openai import OpenAIEmbeddings
-from langchain_pinecone import PineconeVectorStore
 
+from src.cache import ExactCache, SemanticCache
+from src.vectorstore import get_embeddings, get_vector_store
 
-@tool
-def retrieve_faq(query: str) -> str:
-    """Search the clinic's knowledge base for answers to frequently asked questions."""
+# Local copy of the index written by ``src.ingest``: L2-normalised chunk embeddings (K x 1536,
+# float32) and the chunk texts in the same order. When present, searches run against it instead
+# of Pinecone. Both live in the repository root, whatever the working directory.
+_REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+KB_EMBEDDINGS_PATH = os.path.join(_REPO_ROOT, "kb_embeddings.npy")
+KB_TEXTS_PATH = os.path.join(_REPO_ROOT, "kb_texts.json")
+
+# Query text -> embedding. The model is fixed, so an embedding never goes stale; the bound is on size.
+_QUERY_VECTORS = ExactCache(ttl=float("inf"), max_entries=1024)
+# Query embedding -> (k, passages) from the remote index, so near-duplicate questions skip the
+# Pinecone round-trip. The local index is searched faster than this cache could be consulted.
+_REMOTE_RESULTS = SemanticCache(threshold=0.95, max_entries=500)
+
+
+def _remember_query_vector(query: str, vector: list[float]) -> list[float]:
+    """Cache a freshly computed query embedding and hand it back."""
+    _QUERY_VECTORS.add(query, vector)
+    return vector
+
+
+def embed_query(query: str) -> list[float]:
+    """Embed a user query with the same model the knowledge base was indexed with."""
+    vector = _QUERY_VECTORS.lookup(query)
+    if vector is not None:
+        return vector
+    return _remember_query_vector(query, get_embeddings().embed_query(query))
+
+
+async def aembed_query(query: str) -> list[float]:
+    """Async variant of :func:`embed_query`."""
+    vector = _QUERY_VECTORS.lookup(query)
+    if vector is not None:
+        return vector
+    return _remember_query_vector(query, await get_embeddings().aembed_query(query))
+
+
+def _quantize(vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Row-wise symmetric int8 quantisation: ``vectors ~= codes * scales[:, None]``."""
+    scales = np.abs(vectors).max(axis=-1, keepdims=True) / 127
+    scales = np.where(scales == 0, 1.0, scales).astype(np.float32)
+    codes = np.round(vectors / scales).astype(np.int8)
+    return codes, scales.squeeze(-1)
+
+
+@lru_cache(maxsize=1)
+def _load_local_index() -> tuple[np.ndarray, np.ndarray, list[str]] | None:
+    """
+    The ingested embeddings (int8 codes and per-row scales) and texts, or None when the
+    knowledge base hasn't been exported.
+
+    A quarter of the float32 footprint; the rounding error is far below the gap between
+    relevant and irrelevant chunks, so the top-k ranking is unaffected in practice.
+    """
+    if not (os.path.exists(KB_EMBEDDINGS_PATH) and os.path.exists(KB_TEXTS_PATH)):
+        return None
 
-    index_name = "acme-dental-index"
-    embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
+    codes, scales = _quantize(np.load(KB_EMBEDDINGS_PATH))
+    with open(KB_TEXTS_PATH) as f:
+        texts = json.load(f)
+    return codes, scales, texts
 
-    docsearch = PineconeVectorStore.from_existing_index(index_name=index_name, embedding=embeddings)
 
-    docs = docsearch.similarity_search(query, k=3)
-    return "\n\n".join([d.page_content for d in docs])
+def _search_local(index: tuple[np.ndarray, np.ndarray, list[str]], embedding: list[float], k: int) -> str:
+    """Top-``k`` passages by cosine similarity, best first; the KB is small enough to score in full."""
+    codes, scales, texts = index
+    query_codes, _ = _quantize(np.asarray(embedding, dtype=np.float32))
+
+    # Accumulate in int32 (127 * 127 * 1536 overflows int16); the query's own scale and norm are
+    # the same for every row, so they don't change the ranking and are left out.
+    scores = (codes @ query_codes.astype(np.int32)) * scales
+    k = min(k, len(texts))
+    top = np.argpartition(scores, -k)[-k:] if k < len(texts) else np.arange(len(texts))
+    top = top[np.argsort(scores[top])[::-1]]
+    return "\n\n".join(texts[i] for i in top)
+
+
+def _search_without_network(embedding: list[float], k: int) -> str | None:
+    """Passages from the local index or a cached remote search; None when Pinecone must be asked."""
+    local = _load_local_index()
+    if local is not None:
+        return _search_local(local, embedding, k)
+
+    cached = _REMOTE_RESULTS.lookup(embedding)
+    if cached is not None and cached[0] == k:
+        return cached[1]
+    return None
+
+
+def _remember_remote_results(embedding: list[float], k: int, docs) -> str:
+    """Join the passages Pinecone returned and cache them under the query embedding."""
+    context = "\n\n".join([d.page_content for d in docs])
+    _REMOTE_RESULTS.add(embedding, (k, context))
+    return context
+
+
+def search_faq_by_vector(embedding: list[float], k: int = 3) -> str:
+    """Return the knowledge base passages closest to an already computed query embedding."""
+    context = _search_without_network(embedding, k)
+    if context is not None:
+        return context
+    docs = get_vector_store().similarity_search_by_vector(embedding, k=k)
+    return _remember_remote_results(embedding, k, docs)
+
+
+async def asearch_faq_by_vector(embedding: list[float], k: int = 3) -> str:
+    """Async variant of :func:`search_faq_by_vector`."""
+    context = _search_without_network(embedding, k)
+    if context is not None:
+        return context
+    docs = await get_vector_store().asimilarity_search_by_vector(embedding, k=k)
+    return _remember_remote_results(embedding, k, docs)
+
+
+@tool
+def retrieve_faq(query: str) -> str:
+    """Search the clinic's knowledge base for answers to frequently asked questions."""
+    return search_faq_by_vector(embed_query(query))
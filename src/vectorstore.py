@@ -0,0 +1,37 @@
+"""Clients for the knowledge base index, shared by ingestion and FAQ retrieval."""
+
+import os
+from functools import lru_cache
+
+from langchain_openai import OpenAIEmbeddings
+
+INDEX_NAME = "acme-dental-index"
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+
+@lru_cache(maxsize=1)
+def get_embeddings() -> OpenAIEmbeddings:
+    """
+    The embedding model the index is built and queried with; one instance per process.
+
+    ``chunk_size`` lets ingestion embed up to 2048 chunks per request (the endpoint's input
+    limit); single-query embedding is unaffected.
+    """
+    return OpenAIEmbeddings(model=EMBEDDING_MODEL, chunk_size=2048)
+
+
+@lru_cache(maxsize=1)
+def get_pinecone():
+    """Process-wide Pinecone client for PINECONE_API_KEY."""
+    # The SDKs are imported on first use: FAQ retrieval normally runs on the exported local copy
+    from pinecone import Pinecone
+
+    return Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
+
+
+@lru_cache(maxsize=1)
+def get_vector_store():
+    """The knowledge base index as a LangChain vector store, opened once."""
+    from langchain_pinecone import PineconeVectorStore
+
+    return PineconeVectorStore(index=get_pinecone().Index(INDEX_NAME), embedding=get_embeddings())
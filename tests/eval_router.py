@@ -6,7 +6,7 @@ import sys
 
 from dotenv import load_dotenv
 from langchain_core.messages import HumanMessage
-from langsmith import Client, evaluate
+from langsmith import Client, aevaluate
 
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 
@@ -19,14 +19,15 @@ examples = [
     ("I want to book an appointment", "BOOK"),
     ("Cancel my booking please", "CANCEL"),
     ("I need to reschedule for next week", "RESCHEDULE"),
-    ("What are your opening hours?", "GENERAL"),  # Router usually falls back to GENERAL/FAQ check downstream?
-    # Actually router maps to "GENERAL" or "FAQ".
-    # We'll expect GENERAL or FAQ depending on LLM.
-    # Let's say GENERAL for now.
+    ("What are your opening hours?", "FAQ"),  # Caught by the router's FAQ keyword fast path
     ("Can I schedule a checkup", "BOOK"),
 ]
 
 
+# Examples evaluated concurrently (aevaluate's default of 0 runs them one at a time).
+MAX_CONCURRENCY = 4
+
+
 # 2. Define Evaluator
 def exact_match(run, example):
     # run.outputs is the state returned by router
@@ -36,12 +37,12 @@ def exact_match(run, example):
 
 
 # 3. Define Target Function
-def target(inputs):
+async def target(inputs):
     """Wrap the router node."""
     msg = inputs["text"]
     state = {"messages": [HumanMessage(content=msg)], "flow": "IDLE"}
     # Call the router function directly
-    result = router(state)
+    result = await router(state)
     return {"intent": result.get("intent")}
 
 
@@ -52,16 +53,29 @@ async def run_eval():
     dataset_name = "Dental Router Smoke Test"
 
     # Check if dataset exists, if not create it
-    ds = None
     if client.has_dataset(dataset_name=dataset_name):
         ds = client.read_dataset(dataset_name=dataset_name)
     else:
         ds = client.create_dataset(dataset_name=dataset_name)
-        for text, label in examples:
-            client.create_example(inputs={"text": text}, outputs={"intent": label}, dataset_id=ds.id)
 
-    # Run evaluation
-    results = evaluate(target, data=dataset_name, evaluators=[exact_match], experiment_prefix="router-smoke-test")
+    # Sync the stored examples with the list above, so a changed label (e.g. opening hours moving
+    # from GENERAL to FAQ) doesn't keep failing against the reference recorded by an earlier run
+    existing = {example.inputs.get("text"): example for example in client.list_examples(dataset_id=ds.id)}
+    for text, label in examples:
+        example = existing.get(text)
+        if example is None:
+            client.create_example(inputs={"text": text}, outputs={"intent": label}, dataset_id=ds.id)
+        elif (example.outputs or {}).get("intent") != label:
+            client.update_example(example.id, outputs={"intent": label})
+
+    # Run evaluation; examples are independent, so classify several at once instead of one by one
+    results = await aevaluate(
+        target,
+        data=dataset_name,
+        evaluators=[exact_match],
+        experiment_prefix="router-smoke-test",
+        max_concurrency=MAX_CONCURRENCY,
+    )
 
     print("\nResults:", results)
 